@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from src.utils.serialization import ORJSONResponse
 from src.api.auth.schemas import UserCreate, UserLogin
 from src.database.init_tidb import init_tidb
 from src.database import TiDBHandler
-from src.database.users import add_user, fetch_user_by_username, verify_password
+from src.database.aio.users import add_user, fetch_user_by_username, verify_password
 
 from src.config import logger  # Import the logger
 
@@ -16,16 +16,16 @@ async def create_user(user: UserCreate, db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Auth] Create new user id with user information : {user}")
     try:
         # Check if the user already exists
-        existing_user = fetch_user_by_username(user.username, db)
+        existing_user = await fetch_user_by_username(user.username, db)
         if existing_user:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"status": "error", "message": "Username already exists"},
             )
 
         # Add new user
-        user_data = add_user(user.username, user.password, db)
-        return JSONResponse(
+        user_data = await add_user(user.username, user.password, db)
+        return ORJSONResponse(
             status_code=201,
             content={
                 "status": "success",
@@ -50,16 +50,16 @@ async def login_user(user: UserLogin, db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Auth] Login into the user id with user information : {user}")
     try:
         # Fetch user details from db
-        db_user = fetch_user_by_username(user.username, db)
+        db_user = await fetch_user_by_username(user.username, db)
 
         # Validate user credentials
         if not db_user or not verify_password(user.password, db_user["password"]):
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=401,
                 content={"status": "error", "message": "Invalid username or password"},
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
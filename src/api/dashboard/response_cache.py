@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+
+from src.utils.serialization import dumps_bytes
+from src.config import DASHBOARD_CACHE_TTLS, DASHBOARD_CACHE_STALE_TTL, logger
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    created_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    def to_response(self, request: Request, ttl: float) -> Response:
+        """Renders the entry, answering 304 when the client already holds this ETag."""
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"private, max-age={max(int(ttl - self.age()), 0)}",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=self.body,
+            status_code=200,
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+class ResponseCache:
+    """
+    In-process cache of rendered JSON responses for slowly changing aggregates.
+
+    - Fresh entries (younger than the endpoint TTL) are served without touching the loader.
+    - Stale entries (within stale_ttl past the TTL) are served immediately while one
+      background task reloads them.
+    - Concurrent misses for the same key share a single loader call.
+    Loaders open their own DB session, so cache hits never check out a connection.
+    """
+
+    def __init__(self, ttls: Dict[str, float], stale_ttl: float):
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, CachedResponse] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refresh_errors": 0}
+
+    def ttl(self, key: str) -> float:
+        return self.ttls.get(key, self.ttls["default"])
+
+    async def get(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> CachedResponse:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = entry.age()
+            if age < self.ttl(key):
+                self._counters["hits"] += 1
+                return entry
+            if age < self.ttl(key) + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._load(key, loader).add_done_callback(
+                        lambda task: self._log_refresh_error(key, task)
+                    )
+                return entry
+
+        self._counters["misses"] += 1
+        return await asyncio.shield(self._load(key, loader))
+
+    async def serve(
+        self, request: Request, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        entry = await self.get(key, loader)
+        return entry.to_response(request, self.ttl(key))
+
+    def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Returns the in-flight load for key, starting one if none is running."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _render(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> CachedResponse:
+        data = await loader()
+        body = dumps_bytes({"status": "success", "data": data})
+        entry = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+        self._entries[key] = entry
+        return entry
+
+    def _log_refresh_error(self, key: str, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._counters["refresh_errors"] += 1
+            logger.warning(
+                f"[Dashboard] Background refresh of '{key}' failed, "
+                f"serving stale data: {task.exception()}"
+            )
+
+    def invalidate(self, key: str = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {
+            **self._counters,
+            "entries": {
+                key: round(entry.age(), 1) for key, entry in self._entries.items()
+            },
+            "inflight": list(self._inflight),
+        }
+
+
+dashboard_cache = ResponseCache(DASHBOARD_CACHE_TTLS, DASHBOARD_CACHE_STALE_TTL)
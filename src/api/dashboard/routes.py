@@ -1,36 +1,60 @@
 import numpy as np
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from src.config import logger
 from src.database import TiDBHandler
-from src.database.init_tidb import init_tidb
-from src.database.dashboard import (
-    get_aggregated_counts,
-    update_aggregated_counts,
-    retrieve_previous_aggregated_counts,
-    get_query_countries,
-    get_queries_over_time,
+from src.database.init_tidb import init_tidb, tidb_session
+from src.database import dashboard as _dashboard
+from src.database.aio.executor import to_async
+from src.database.vectors import EMBEDDING_DIMENSION
+from src.database.aio.counters import get_dashboard_counters
+from src.database.aio.dashboard import (
     fetch_all_embeddings,
     fetch_category_embeddings,
-    update_query_categories,
-    get_top_categories,
-    match_query_to_category,
 )
+from src.database.aio.projections import fetch_projections_page
+from src.api.dashboard.response_cache import dashboard_cache
+from src.api.dashboard.transport import (
+    ARROW_STREAM_MEDIA_TYPE,
+    arrow_vector_stream,
+    compress_stream,
+    negotiate_encoding,
+)
+from src.utils.projection.pca import fit_pca, project
+from src.utils.serialization import ORJSONResponse
 
 dashboard_router = APIRouter()
 
 
+def session_loader(func):
+    """Cache loader running func on its own session, so cache hits need no connection."""
+
+    def load():
+        with tidb_session() as db:
+            return func(db)
+
+    return to_async(load)
+
+
+load_query_countries = session_loader(_dashboard.get_query_countries)
+load_queries_over_time = session_loader(_dashboard.get_queries_over_time)
+fetch_top_categories = session_loader(_dashboard.get_top_categories)
+
+
+async def load_top_categories():
+    return {"top_categories": await fetch_top_categories()}
+
+
 @dashboard_router.get("/aggregated_counts")
 async def retrieve_aggregated_counts(db: TiDBHandler = Depends(init_tidb)):
-    logger.info(f"[Dashboard] Retrieve and update aggregated counts")
+    logger.info(f"[Dashboard] Retrieve aggregated counts")
     try:
-        aggregated_counts = get_aggregated_counts(db)
-        update_aggregated_counts(aggregated_counts, db)
-        pre_counts = retrieve_previous_aggregated_counts(db)
-        for key, value in pre_counts.items():
-            aggregated_counts[f"diff_{key}"] = aggregated_counts[key] - value
+        # Running totals maintained by the write paths; diffs are against the daily rollup
+        aggregated_counts = await get_dashboard_counters(db)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -42,27 +66,20 @@ async def retrieve_aggregated_counts(db: TiDBHandler = Depends(init_tidb)):
 
 
 @dashboard_router.get("/aggregated_country_counts")
-async def retrieve_country_counts(db: TiDBHandler = Depends(init_tidb)):
+async def retrieve_country_counts(request: Request):
     logger.info(f"[Dashboard] Retrieve country counts")
     try:
-        country_counts = get_query_countries(db)
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "data": country_counts,
-            },
+        return await dashboard_cache.serve(
+            request, "aggregated_country_counts", load_query_countries
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @dashboard_router.get("/queries-over-time")
-async def retrieve_query_activity_timeline(db: TiDBHandler = Depends(init_tidb)):
+async def retrieve_query_activity_timeline(request: Request):
     logger.info(f"[Dashboard] Retrieve activity timeline of the queries")
     try:
-        queries_over_time = get_queries_over_time(db)
         # in df format with columns: creation_date, daily_thread_count
         """
         [{"creation_date": "2024-08-05", "daily_thread_count": 1}, 
@@ -72,12 +89,8 @@ async def retrieve_query_activity_timeline(db: TiDBHandler = Depends(init_tidb))
         {"creation_date": "2024-08-14", "daily_thread_count": 1}, 
         {"creation_date": "2024-08-18", "daily_thread_count": 19}]
         """
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "data": queries_over_time,
-            },
+        return await dashboard_cache.serve(
+            request, "queries-over-time", load_queries_over_time
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,7 +101,7 @@ async def retrieve_query_activity_timeline(db: TiDBHandler = Depends(init_tidb))
 async def retrieve_keyword_ranking(db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Dashboard] Retrieve keywords ranking")
     # Functionality not implemented yet
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=501,
         content={
             "status": "error",
@@ -98,67 +111,130 @@ async def retrieve_keyword_ranking(db: TiDBHandler = Depends(init_tidb)):
 
 
 @dashboard_router.get("/top_categories")
-async def retrieve_top_categories(db: TiDBHandler = Depends(init_tidb)):
+async def retrieve_top_categories(request: Request):
     logger.info(f"[Dashboard] Retrieve top categories of the queries")
     try:
-        thread_ids, queries, embeddings = fetch_all_embeddings(db)
-
-        # Ensure embeddings is a 2D numpy array
-        embeddings = np.array(embeddings)
-        if embeddings.ndim != 2:
-            raise ValueError(
-                "Embeddings array is not 2D. Please check the data format.",
-                response_model=JSONResponse,
-            )
+        # Categories are assigned when threads are created and by the category sweeper
+        return await dashboard_cache.serve(
+            request, "top_categories", load_top_categories
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Categorize each query using vector search
-        named_categories = [
-            match_query_to_category(db, embedding) for embedding in embeddings
-        ]
 
-        # Update categories in the database
-        update_query_categories(thread_ids, named_categories, db)
+def as_matrix(vectors, dim: int) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return (
+        vectors.reshape(len(vectors), dim) if len(vectors) else vectors.reshape(0, dim)
+    )
 
-        # Fetch and return the top categories
-        top_categories = get_top_categories(db)
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "data": {"top_categories": top_categories},
-            },
+
+def reduce_embeddings(embeddings, category_embeddings, dims: int):
+    """Projects queries and categories onto the top PCA components of the queries."""
+    if len(embeddings) == 0:
+        return as_matrix([], dims), as_matrix([], dims)
+    mean, components = fit_pca(embeddings, dims)
+    return project(embeddings, mean, components), project(
+        category_embeddings, mean, components
+    )
+
+
+@dashboard_router.get("/queries-embeddings")
+async def retreive_queries_embeddings(
+    request: Request,
+    format: str = Query("json", pattern="^(json|arrow)$"),
+    dims: Optional[int] = Query(None, ge=2, le=3),
+    db: TiDBHandler = Depends(init_tidb),
+):
+    """
+    Query and category embeddings for the embeddings map.
+
+    - format=arrow streams an Arrow IPC table (kind, id, label, vector) with float32
+      vectors instead of nested JSON lists.
+    - dims=2|3 returns PCA coordinates instead of the full vectors.
+    - The body is gzip/zstd compressed when the client's Accept-Encoding allows it.
+    """
+    logger.info(f"[Dashboard] Retrieve queries-embeddings")
+    try:
+        thread_ids, queries, embeddings = await fetch_all_embeddings(db)
+        category_names, category_embeddings = await fetch_category_embeddings(db)
+        if dims:
+            embeddings, category_embeddings = await run_in_threadpool(
+                reduce_embeddings, embeddings, category_embeddings, dims
+            )
+        reduction = "pca" if dims else "none"
+
+        if format == "arrow":
+            dim = dims or EMBEDDING_DIMENSION
+            chunks = arrow_vector_stream(
+                kinds=["query"] * len(queries) + ["category"] * len(category_names),
+                ids=list(thread_ids) + [None] * len(category_names),
+                labels=list(queries) + list(category_names),
+                vectors=np.vstack(
+                    [as_matrix(embeddings, dim), as_matrix(category_embeddings, dim)]
+                ),
+                metadata={"dims": str(dim), "reduction": reduction},
+            )
+            media_type = ARROW_STREAM_MEDIA_TYPE
+        else:
+            response = ORJSONResponse(
+                status_code=200,
+                content={
+                    "status": "success",
+                    "data": {
+                        "thread_ids": list(thread_ids),
+                        "queries": queries,
+                        "embeddings": np.asarray(embeddings).tolist(),
+                        "category_names": category_names,
+                        "category_embeddings": np.asarray(category_embeddings).tolist(),
+                        "reduction": reduction,
+                    },
+                },
+            )
+            chunks = [response.body]
+            media_type = "application/json"
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        elif format == "json":
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        return StreamingResponse(
+            compress_stream(chunks, encoding), media_type=media_type, headers=headers
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@dashboard_router.get("/queries-embeddings")
-async def retreive_queries_embeddings(db: TiDBHandler = Depends(init_tidb)):
-    logger.info(f"[Dashboard] Retrieve queries-embeddings")
+@dashboard_router.get("/projections")
+async def retrieve_query_projections(
+    after: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: TiDBHandler = Depends(init_tidb),
+):
+    """
+    Precomputed map coordinates of the query embeddings, paginated by thread id.
+
+    Pass the returned next_after as `after` to fetch the following page; it is null
+    on the last page. Projections are maintained by the projection sweeper.
+    """
+    logger.info(f"[Dashboard] Retrieve query projections after thread {after}")
     try:
-        _, queries, embeddings = fetch_all_embeddings(db)
-        category_names, category_embeddings = fetch_category_embeddings(db)
-        # Convert embeddings from numpy array to list of lists for JSON serialization
-        embeddings = [
-            embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
-            for embedding in embeddings
-        ]
-        category_embeddings = [
-            embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
-            for embedding in category_embeddings
-        ]
-
-        return JSONResponse(
+        items = await fetch_projections_page(after, limit, db)
+        next_after = items[-1]["thread_id"] if len(items) == limit else None
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
-                "data": {
-                    "queries": queries,
-                    "embeddings": embeddings,
-                    "category_names": category_names,
-                    "category_embeddings": category_embeddings,
-                },
+                "data": {"items": items, "next_after": next_after},
             },
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@dashboard_router.get("/cache-stats")
+async def read_dashboard_cache_stats():
+    return {"status": "success", "data": dashboard_cache.stats()}
@@ -0,0 +1,94 @@
+import io
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import zstandard
+
+# Content-Encoding values we can produce, in order of preference
+SUPPORTED_ENCODINGS = ["zstd", "gzip"]
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks the preferred encoding the client accepts (ignoring q=0 entries)."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress_stream(
+    chunks: Iterable[bytes], encoding: Optional[str]
+) -> Iterator[bytes]:
+    """Compresses a stream of byte chunks incrementally with gzip or zstd."""
+    if encoding is None:
+        yield from chunks
+        return
+
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def arrow_vector_stream(
+    kinds: List[str],
+    ids: List[Optional[int]],
+    labels: List[str],
+    vectors: np.ndarray,
+    metadata: Dict[str, str],
+    batch_size: int = 1024,
+) -> Iterator[bytes]:
+    """
+    Serializes rows of (kind, id, label, vector) as an Arrow IPC stream.
+
+    Vectors are a fixed_size_list<float32> column (little-endian, zero-copy on the
+    client), and the stream is yielded one record batch at a time.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1] if vectors.ndim == 2 else 0
+    schema = pa.schema(
+        [
+            ("kind", pa.string()),
+            ("id", pa.int64()),
+            ("label", pa.string()),
+            ("vector", pa.list_(pa.float32(), dim)),
+        ],
+        metadata=metadata,
+    )
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for start in range(0, len(labels), batch_size):
+            end = start + batch_size
+            flat = pa.array(vectors[start:end].reshape(-1), type=pa.float32())
+            batch = pa.record_batch(
+                [
+                    pa.array(kinds[start:end], type=pa.string()),
+                    pa.array(ids[start:end], type=pa.int64()),
+                    pa.array(labels[start:end], type=pa.string()),
+                    pa.FixedSizeListArray.from_arrays(flat, dim),
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    yield sink.getvalue()
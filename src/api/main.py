@@ -6,8 +6,21 @@ import os
 from src.api.auth.routes import auth_router
 from src.api.threads.routes import threads_router
 from src.api.dashboard.routes import dashboard_router
+from src.database.init_tidb import get_tidb_pool, tidb_session
+from src.database.jobs import fail_interrupted_thread_jobs
+from src.utils.job_queue.job_queue import thread_job_queue
+from src.utils.job_queue.sweepers import (
+    category_sweeper,
+    projection_sweeper,
+    access_flusher,
+)
+from src.utils.job_queue.access_tracker import thread_access_tracker
+from src.utils.data_generator.serp_cache import serp_cache
+from src.utils.openai.embeddings.embedding_cache import embedding_cache
+from src.utils.serialization import ORJSONResponse
+from src.config import logger
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
 origins = [
@@ -29,10 +42,57 @@ app.include_router(threads_router, prefix="/threads", tags=["threads"])
 app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
 
 
+@app.on_event("startup")
+def recover_thread_jobs():
+    try:
+        with tidb_session() as db:
+            fail_interrupted_thread_jobs(db)
+    except Exception as e:
+        logger.error(f"[Jobs] Failed to recover interrupted thread jobs: {e}")
+
+
+@app.on_event("startup")
+def start_sweepers():
+    category_sweeper.start()
+    projection_sweeper.start()
+    access_flusher.start()
+
+
+@app.on_event("shutdown")
+def stop_thread_jobs():
+    category_sweeper.stop()
+    projection_sweeper.stop()
+    access_flusher.stop()
+    thread_access_tracker.flush()
+    thread_job_queue.shutdown()
+
+
+@app.on_event("shutdown")
+def dispose_tidb_pool():
+    pool = get_tidb_pool()
+    logger.info(f"[TIDB] Disposing connection pool: {pool.stats()}")
+    pool.dispose()
+
+
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to Trend-Maker!"}
 
 
+@app.get("/db/pool-stats")
+async def read_pool_stats():
+    return {"status": "success", "data": get_tidb_pool().stats()}
+
+
+@app.get("/serpapi/cache-stats")
+async def read_serpapi_cache_stats():
+    return {"status": "success", "data": serp_cache.stats()}
+
+
+@app.get("/embeddings/cache-stats")
+async def read_embedding_cache_stats():
+    return {"status": "success", "data": embedding_cache.stats()}
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
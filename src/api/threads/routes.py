@@ -1,15 +1,11 @@
-import json
-from datetime import datetime
-import numpy as np
-from typing import List, Dict
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 
 from src.database import TiDBHandler
 from src.database.init_tidb import init_tidb
-from src.database.threads import (
-    create_thread,
+from src.database.aio.threads import (
     fetch_user_threads,
     update_thread_name,
     create_thread_snapshot,
@@ -18,28 +14,30 @@ from src.database.threads import (
     remove_thread_by_id,
     remove_snapshot,
 )
-from src.database.strategies import (
+from src.database.aio.jobs import create_thread_job, fetch_thread_job
+from src.database.aio.strategies import (
     add_strategies,
     fetch_snapshot_strategies,
 )
 
+from src.database.aio.interest_points import fetch_interest_points
+from src.database.interest_points import MAX_UNIX_SECONDS, from_unix
 from src.api.threads.schemas import QueryRequest
 
-from src.utils.openai.embeddings.generate_embeddings import get_embeddings
-from src.utils.openai.query_processor.process_query import process_query
-from src.utils.data_generator.data_handler import update_raw_data, update_processed_data
-from src.utils.openai.strategy_creator.create_strategy import (
-    create_general_strategy,
-    create_brand_identities,
-)
+from src.utils.data_generator.data_handler import update_processed_data
+from src.utils.job_queue.job_queue import thread_job_queue
+from src.utils.job_queue.thread_initiation import run_thread_initiation
+from src.utils.job_queue.access_tracker import thread_access_tracker
+from src.utils.openai.strategy_creator.create_strategy import create_strategies
 
-from src.database.statistics import (
+from src.database.aio.statistics import (
     get_raw_data,
     get_processed_data,
     insert_snapshot_data,
     get_snapshot_data,
 )
 
+from src.utils.serialization import ORJSONResponse, loads
 from src.config import logger  # Import the logger
 
 
@@ -51,64 +49,81 @@ async def initiate_query(
     request: QueryRequest,
     db: TiDBHandler = Depends(init_tidb),
 ):
+    logger.info(f"[Threads] Initiate query endpoint called with request: {request}")
     try:
-        logger.info(f"[Threads] Initiate query endpoint called with request: {request}")
-        user_id = request.user_id
-        user_query = request.user_query
-        country = request.country
-
-        # Process the user's query to extract metadata and keywords
-        query_metadata = process_query(user_query)
-        keywords = query_metadata.get("keywords", [])
-        thread_name = query_metadata.get("name", "Untitled Thread")
-
-        # Generate embeddings for the query and its keywords
-        query_embeddings = get_embeddings(user_query)
-        keywords_embeddings = get_embeddings(", ".join(keywords))
-
-        # Create a new thread in the database
-        thread_id = create_thread(
-            user_id=user_id,
-            name=thread_name,
-            query=user_query,
-            country=country,
-            query_embeddings=query_embeddings,
-            keywords=keywords,
-            keywords_embeddings=keywords_embeddings,
-            db=db,
-        )
-
-        # Fetch and process trend data
-        raw_queries, raw_data = update_raw_data(thread_id, keywords, country, db)
-        processed_data = update_processed_data(thread_id, raw_queries, raw_data, db)
-
-        return JSONResponse(
-            status_code=200,
+        # Record the job and hand the heavy lifting to the background workers
+        job_id = await create_thread_job(
+            request.user_id, request.user_query, request.country, db
+        )
+        thread_job_queue.submit(
+            job_id,
+            run_thread_initiation,
+            request.user_id,
+            request.user_query,
+            request.country,
+        )
+
+        return ORJSONResponse(
+            status_code=202,
             content={
                 "status": "success",
-                "message": "Thread initialized successfully",
-                "data": {"thread_id": thread_id, "processed_data": processed_data},
+                "message": "Thread initiation queued",
+                "data": {"job_id": job_id, "status": "queued"},
             },
         )
 
     except Exception as e:
-        # Log the exception if you have a logger setup, e.g., logger.error(f"Error initiating query: {e}")
-        remove_thread_by_id(thread_id, db)
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while initiating the query: {str(e)}",
         )
 
 
+@threads_router.get("/jobs/{job_id}")
+async def read_thread_job(job_id: int, db: TiDBHandler = Depends(init_tidb)):
+    logger.info(f"[Threads] Retrieve thread job with job id: {job_id}")
+    try:
+        job = await fetch_thread_job(job_id, db)
+
+        if not job:
+            return ORJSONResponse(
+                status_code=404,
+                content={
+                    "status": "error",
+                    "message": "Job not found.",
+                    "data": None,
+                },
+            )
+
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "status": "success",
+                "message": "Job retrieved successfully.",
+                "data": job,
+            },
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "status": "error",
+                "message": "Failed to retrieve job.",
+                "error": str(e),
+            },
+        )
+
+
 @threads_router.get("/user/{user_id}")
 async def read_user_threads(user_id: int, db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Threads] Retrieve user threads with user_id: {user_id}")
 
     try:
-        user_threads = fetch_user_threads(user_id, db)
+        user_threads = await fetch_user_threads(user_id, db)
 
         if not user_threads:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={
                     "status": "error",
@@ -117,7 +132,7 @@ async def read_user_threads(user_id: int, db: TiDBHandler = Depends(init_tidb)):
                 },
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -143,10 +158,10 @@ async def rename_thread_name(
 ):
     logger.info(f"[Threads] Renaming thread endpoint by thread id: {thread_id}")
     try:
-        updated_thread = update_thread_name(thread_id, new_name, db)
+        updated_thread = await update_thread_name(thread_id, new_name, db)
 
         if not updated_thread:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={
                     "status": "error",
@@ -155,7 +170,7 @@ async def rename_thread_name(
                 },
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -178,11 +193,12 @@ async def rename_thread_name(
 @threads_router.get("/metadata/{thread_id}")
 async def read_thread_metadata(thread_id: int, db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Threads] Retreive thread metadata with thread id: {thread_id}")
+    thread_access_tracker.record(thread_id)
     try:
-        thread_metadata = fetch_thread_metadata(thread_id, db)
+        thread_metadata = await fetch_thread_metadata(thread_id, db)
 
         if not thread_metadata:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={
                     "status": "error",
@@ -191,7 +207,7 @@ async def read_thread_metadata(thread_id: int, db: TiDBHandler = Depends(init_ti
                 },
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -215,8 +231,8 @@ async def read_thread_metadata(thread_id: int, db: TiDBHandler = Depends(init_ti
 async def delete_thread(thread_id: int, db: TiDBHandler = Depends(init_tidb)):
     logger.info(f"[Threads] Renaming thread endpoint by thread id: {thread_id}")
     try:
-        remove_thread_by_id(thread_id, db)
-        return JSONResponse(
+        await remove_thread_by_id(thread_id, db)
+        return ORJSONResponse(
             status_code=200,
             content={"status": "success", "message": "Thread deleted successfully."},
         )
@@ -237,13 +253,16 @@ async def get_current_statistics(thread_id: int, db: TiDBHandler = Depends(init_
     logger.info(
         f"Retrive or update processed data from tidb with thread id: {thread_id}"
     )
+    thread_access_tracker.record(thread_id)
     try:
-        processed_data = get_processed_data(thread_id, db)
+        processed_data = await get_processed_data(thread_id, db)
         if processed_data is None:
-            raw_data, raw_queries = get_raw_data(thread_id, db)
-            processed_data = update_processed_data(thread_id, raw_queries, raw_data, db)
+            trend_data = await get_raw_data(thread_id, db)
+            processed_data = await run_in_threadpool(
+                update_processed_data, thread_id, trend_data, db
+            )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -252,7 +271,7 @@ async def get_current_statistics(thread_id: int, db: TiDBHandler = Depends(init_
             },
         )
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -262,16 +281,67 @@ async def get_current_statistics(thread_id: int, db: TiDBHandler = Depends(init_
         )
 
 
+@threads_router.get("/interest/{thread_id}")
+async def read_interest_points(
+    thread_id: int,
+    start: Optional[int] = Query(None, ge=0, le=MAX_UNIX_SECONDS),
+    end: Optional[int] = Query(None, ge=0, le=MAX_UNIX_SECONDS),
+    keywords: Optional[str] = None,
+    db: TiDBHandler = Depends(init_tidb),
+):
+    """
+    Interest Over Time history of a thread, for charts that only need the range they show.
+
+    start and end are unix seconds (inclusive); keywords is an optional comma-separated filter.
+    """
+    logger.info(f"[Threads] Retrieve interest points with thread id: {thread_id}")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "status": "error",
+                "message": "start must not be after end.",
+            },
+        )
+    thread_access_tracker.record(thread_id)
+    try:
+        series = await fetch_interest_points(
+            thread_id,
+            db,
+            start=from_unix(start) if start is not None else None,
+            end=from_unix(end) if end is not None else None,
+            keywords=keywords.split(",") if keywords else None,
+        )
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "status": "success",
+                "message": "Interest points retrieved successfully.",
+                "data": series,
+            },
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "status": "error",
+                "message": "Failed to retrieve interest points.",
+                "error": str(e),
+            },
+        )
+
+
 @threads_router.get("/snapshot/{thread_id}")
 async def read_threads_snapshot(thread_id: int, db: TiDBHandler = Depends(init_tidb)):
     logger.info(
         f"[Threads] Retrieving snapshot list of data with thread id: {thread_id}"
     )
+    thread_access_tracker.record(thread_id)
     try:
-        snapshot_list = fetch_thread_snapshots(thread_id, db)
+        snapshot_list = await fetch_thread_snapshots(thread_id, db)
 
         if not snapshot_list:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=201,
                 content={
                     "status": "success",
@@ -280,7 +350,7 @@ async def read_threads_snapshot(thread_id: int, db: TiDBHandler = Depends(init_t
                 },
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -305,26 +375,29 @@ async def take_threads_snapshot(thread_id: int, db: TiDBHandler = Depends(init_t
     logger.info(
         f"Retrieving processed data to snapshot table and generate stretegies with thread id: {thread_id}"
     )
+    snapshot_metadata = None
     try:
-        thread_metadata = fetch_thread_metadata(thread_id, db)
-        snapshot_metadata = create_thread_snapshot(thread_metadata, db)
+        thread_metadata = await fetch_thread_metadata(thread_id, db)
+        snapshot_metadata = await create_thread_snapshot(thread_metadata, db)
 
         query = thread_metadata["query"]
         keywords = thread_metadata["keywords"]
 
         # Retrieving processed data and saving to snapshot statistics table
-        processed_data = get_processed_data(thread_id, db)
-        insert_snapshot_data(thread_id, snapshot_metadata["id"], processed_data, db)
-
-        # Generating strategies
-        strategies_metadata = create_general_strategy(query, keywords, processed_data)
-        brand_identities = create_brand_identities(strategies_metadata, db)
+        processed_data = await get_processed_data(thread_id, db)
+        await insert_snapshot_data(
+            thread_id, snapshot_metadata["id"], processed_data, db
+        )
 
-        # Merging strategy metadata with brand identities
-        strategies_metadata.update(brand_identities)
-        add_strategies(thread_id, snapshot_metadata["id"], strategies_metadata, db)
+        # Generating strategies and brand identities
+        strategies_metadata = await create_strategies(
+            query, keywords, processed_data, db
+        )
+        await add_strategies(
+            thread_id, snapshot_metadata["id"], strategies_metadata, db
+        )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -337,7 +410,8 @@ async def take_threads_snapshot(thread_id: int, db: TiDBHandler = Depends(init_t
             },
         )
     except Exception as e:
-        remove_snapshot(snapshot_metadata["id"], db)
+        if snapshot_metadata is not None:
+            await remove_snapshot(snapshot_metadata["id"], db)
         raise HTTPException(
             status_code=500,
             detail={
@@ -356,20 +430,22 @@ async def get_strategies_for_snapshot(
         f"Retrieving strategies with thread id and snapshot id: {thread_id}, {snapshot_id}"
     )
     try:
-        strategies_metadata = fetch_snapshot_strategies(thread_id, snapshot_id, db)
+        strategies_metadata = await fetch_snapshot_strategies(
+            thread_id, snapshot_id, db
+        )
 
         if strategies_metadata:
-            strategies_metadata["logo_image"] = json.loads(
+            strategies_metadata["logo_image"] = loads(
                 strategies_metadata.get("logo_image", "")
             )
-            strategies_metadata["brand_logo"] = json.loads(
+            strategies_metadata["brand_logo"] = loads(
                 strategies_metadata.get("brand_logo", "")
             )
             strategies_metadata["brand_name"] = strategies_metadata.get(
                 "brand_name", ""
             ).upper()
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -398,8 +474,8 @@ async def get_statistics_for_snapshot(
     )
     try:
         # processed_data = get_snapshot_statistics(thread_id, snapshot_id, db)
-        processed_data = get_snapshot_data(thread_id, snapshot_id, db)
-        return JSONResponse(
+        processed_data = await get_snapshot_data(thread_id, snapshot_id, db)
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -424,10 +500,10 @@ async def delete_snapshot_by_id(snapshot_id: int, db: TiDBHandler = Depends(init
         f"[Threads] Deleting data from the snapshot tabe with snapshot id: {snapshot_id}"
     )
     try:
-        deleted = remove_snapshot(snapshot_id, db)
+        deleted = await remove_snapshot(snapshot_id, db)
 
         if not deleted:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=404,
                 content={
                     "status": "error",
@@ -436,7 +512,7 @@ async def delete_snapshot_by_id(snapshot_id: int, db: TiDBHandler = Depends(init
                 },
             )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
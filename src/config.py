@@ -32,6 +32,91 @@ else:
     OPENAI_CREDENTIAL = {"OPENAI_API_KEY": os.getenv("OPENAI_API_KEY")}
 
 
+# TiDB connection pool settings
+TIDB_POOL_SIZE = int(os.getenv("TIDB_POOL_SIZE", "5"))
+TIDB_POOL_MAX_OVERFLOW = int(os.getenv("TIDB_POOL_MAX_OVERFLOW", "10"))
+TIDB_POOL_TIMEOUT = float(os.getenv("TIDB_POOL_TIMEOUT", "30"))
+TIDB_POOL_RECYCLE = float(os.getenv("TIDB_POOL_RECYCLE", "1800"))
+
+# SerpAPI fan-out settings
+# Seconds allowed for each SerpAPI HTTP request, not counting the rate limiter wait
+SERPAPI_CALL_TIMEOUT = float(os.getenv("SERPAPI_CALL_TIMEOUT", "30"))
+# Searches per second (and burst size) allowed by the SerpAPI plan; 0 disables the limit.
+# Applies per process, only to calls that miss the response cache
+SERPAPI_RATE_LIMIT = float(os.getenv("SERPAPI_RATE_LIMIT", "5"))
+SERPAPI_RATE_BURST = int(os.getenv("SERPAPI_RATE_BURST", "10"))
+
+# Scheduled refresh of every thread's trend data
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "8"))
+# Each refreshed group fans out one SerpAPI call per source (6), so the shared pool
+# defaults to enough threads for every refresh worker at once
+SERPAPI_MAX_WORKERS = int(os.getenv("SERPAPI_MAX_WORKERS", str(REFRESH_WORKERS * 6)))
+REFRESH_MAX_ATTEMPTS = int(os.getenv("REFRESH_MAX_ATTEMPTS", "3"))
+
+# Priority scheduling: every tick refreshes the most overdue threads, up to a budget
+REFRESH_TICK_INTERVAL = float(os.getenv("REFRESH_TICK_INTERVAL", "900"))
+REFRESH_MAX_PER_TICK = int(os.getenv("REFRESH_MAX_PER_TICK", "100"))
+REFRESH_RETRY_DELAY = int(os.getenv("REFRESH_RETRY_DELAY", "3600"))
+# Fraction by which each next refresh time is randomly moved, to spread load over the day
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.2"))
+# (days since the thread was last viewed, refresh interval in hours); threads idle
+# longer than the last tier are not refreshed until someone views them again
+REFRESH_TIERS = [(2, 6), (7, 24), (30, 72), (90, 168)]
+# How often thread views recorded in memory are written to thread_refresh_state
+ACCESS_FLUSH_INTERVAL = float(os.getenv("ACCESS_FLUSH_INTERVAL", "60"))
+
+# raw_data / processed_data rows older than this many days are thinned, once a day,
+# to the newest row per thread and week; 0 disables compaction for that table
+STATISTICS_RETENTION_DAYS = int(os.getenv("STATISTICS_RETENTION_DAYS", "30"))
+RETENTION_DAYS = {
+    "raw_data": int(os.getenv("RAW_DATA_RETENTION_DAYS", STATISTICS_RETENTION_DAYS)),
+    "processed_data": int(
+        os.getenv("PROCESSED_DATA_RETENTION_DAYS", STATISTICS_RETENTION_DAYS)
+    ),
+}
+# Compaction deletes at most this many rows per transaction, pausing between batches
+RETENTION_DELETE_BATCH_SIZE = int(os.getenv("RETENTION_DELETE_BATCH_SIZE", "500"))
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+
+# Background thread initiation jobs
+THREAD_JOB_WORKERS = int(os.getenv("THREAD_JOB_WORKERS", "4"))
+CATEGORY_SWEEP_INTERVAL = float(os.getenv("CATEGORY_SWEEP_INTERVAL", "300"))
+
+# Query embedding projections (2D map coordinates and clusters)
+PROJECTION_SWEEP_INTERVAL = float(os.getenv("PROJECTION_SWEEP_INTERVAL", "600"))
+PROJECTION_CLUSTERS = int(os.getenv("PROJECTION_CLUSTERS", "8"))
+# Clusters are computed on this many PCA components; x/y are the first two
+PROJECTION_CLUSTER_COMPONENTS = int(os.getenv("PROJECTION_CLUSTER_COMPONENTS", "32"))
+# Refit the projection once the thread count grew this much since the last fit
+PROJECTION_REFIT_GROWTH = float(os.getenv("PROJECTION_REFIT_GROWTH", "0.2"))
+
+# Embedding cache settings
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "2048"))
+
+# SerpAPI response cache settings (TTLs in seconds per engine)
+SERPAPI_CACHE_PATH = os.getenv("SERPAPI_CACHE_PATH", "cache/serpapi.sqlite3")
+SERPAPI_CACHE_MAX_ENTRIES = int(os.getenv("SERPAPI_CACHE_MAX_ENTRIES", "5000"))
+SERPAPI_CACHE_TTLS = {
+    "google_trends:TIMESERIES": 6 * 3600,
+    "google_trends:GEO_MAP": 12 * 3600,
+    "google_trends:GEO_MAP_0": 12 * 3600,
+    "google_trends:RELATED_QUERIES": 12 * 3600,
+    "youtube": 24 * 3600,
+    "google_shopping": 72 * 3600,
+    "default": 12 * 3600,
+}
+
+# Dashboard response cache (seconds). Entries are served fresh for their TTL, then
+# served stale for up to DASHBOARD_CACHE_STALE_TTL while a background refresh runs
+DASHBOARD_CACHE_TTLS = {
+    "aggregated_country_counts": 300,
+    "queries-over-time": 300,
+    "top_categories": 600,
+    "default": 300,
+}
+DASHBOARD_CACHE_STALE_TTL = float(os.getenv("DASHBOARD_CACHE_STALE_TTL", "3600"))
+
 # logging_config.py
 import logging
 
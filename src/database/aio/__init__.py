@@ -0,0 +1 @@
+# asyncio-facing wrappers around the blocking data-access functions in src/database
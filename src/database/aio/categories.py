@@ -0,0 +1,5 @@
+from src.database import categories as _categories
+from src.database.aio.executor import to_async
+
+classify_queries = to_async(_categories.classify_queries)
+categorize_threads = to_async(_categories.categorize_threads)
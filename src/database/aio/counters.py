@@ -0,0 +1,6 @@
+from src.database import counters as _counters
+from src.database.aio.executor import to_async
+
+get_dashboard_counters = to_async(_counters.get_dashboard_counters)
+rebuild_dashboard_counters = to_async(_counters.rebuild_dashboard_counters)
+rollup_dashboard_counters = to_async(_counters.rollup_dashboard_counters)
@@ -0,0 +1,10 @@
+from src.database import dashboard as _dashboard
+from src.database.aio.executor import to_async
+
+get_aggregated_counts = to_async(_dashboard.get_aggregated_counts)
+get_queries_over_time = to_async(_dashboard.get_queries_over_time)
+get_query_countries = to_async(_dashboard.get_query_countries)
+fetch_category_embeddings = to_async(_dashboard.fetch_category_embeddings)
+fetch_all_embeddings = to_async(_dashboard.fetch_all_embeddings)
+update_query_categories = to_async(_dashboard.update_query_categories)
+get_top_categories = to_async(_dashboard.get_top_categories)
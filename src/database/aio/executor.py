@@ -0,0 +1,23 @@
+import functools
+from typing import Awaitable, Callable, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+def to_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Wrap a blocking data-access function so it runs on the worker thread pool.
+
+    The wrapped coroutine keeps the name, signature and docstring of the original,
+    so routes can `await` it without holding the event loop for the duration of the query.
+    Each TiDBHandler is only ever used by one awaiting request at a time, which keeps the
+    non thread-safe pymysql connection safe to hand over between worker threads.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,4 @@
+from src.database import interest_points as _interest_points
+from src.database.aio.executor import to_async
+
+fetch_interest_points = to_async(_interest_points.fetch_interest_points)
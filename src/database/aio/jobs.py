@@ -0,0 +1,7 @@
+from src.database import jobs as _jobs
+from src.database.aio.executor import to_async
+
+create_thread_job = to_async(_jobs.create_thread_job)
+update_thread_job = to_async(_jobs.update_thread_job)
+fetch_thread_job = to_async(_jobs.fetch_thread_job)
+fail_interrupted_thread_jobs = to_async(_jobs.fail_interrupted_thread_jobs)
@@ -0,0 +1,5 @@
+from src.database import projections as _projections
+from src.database.aio.executor import to_async
+
+fetch_projections_page = to_async(_projections.fetch_projections_page)
+refresh_projections = to_async(_projections.refresh_projections)
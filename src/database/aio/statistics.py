@@ -0,0 +1,9 @@
+from src.database import statistics as _statistics
+from src.database.aio.executor import to_async
+
+insert_raw_data = to_async(_statistics.insert_raw_data)
+insert_processed_data = to_async(_statistics.insert_processed_data)
+insert_snapshot_data = to_async(_statistics.insert_snapshot_data)
+get_raw_data = to_async(_statistics.get_raw_data)
+get_processed_data = to_async(_statistics.get_processed_data)
+get_snapshot_data = to_async(_statistics.get_snapshot_data)
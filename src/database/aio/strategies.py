@@ -0,0 +1,6 @@
+from src.database import strategies as _strategies
+from src.database.aio.executor import to_async
+
+add_strategies = to_async(_strategies.add_strategies)
+fetch_snapshot_strategies = to_async(_strategies.fetch_snapshot_strategies)
+vector_search_brand = to_async(_strategies.vector_search_brand)
@@ -0,0 +1,11 @@
+from src.database import threads as _threads
+from src.database.aio.executor import to_async
+
+create_thread = to_async(_threads.create_thread)
+fetch_user_threads = to_async(_threads.fetch_user_threads)
+update_thread_name = to_async(_threads.update_thread_name)
+fetch_thread_metadata = to_async(_threads.fetch_thread_metadata)
+remove_thread_by_id = to_async(_threads.remove_thread_by_id)
+create_thread_snapshot = to_async(_threads.create_thread_snapshot)
+fetch_thread_snapshots = to_async(_threads.fetch_thread_snapshots)
+remove_snapshot = to_async(_threads.remove_snapshot)
@@ -0,0 +1,6 @@
+from src.database import users as _users
+from src.database.aio.executor import to_async
+
+add_user = to_async(_users.add_user)
+fetch_user_by_username = to_async(_users.fetch_user_by_username)
+verify_password = _users.verify_password
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from typing import List
+
+import numpy as np
+
+from src.database import TiDBHandler
+from src.database.dashboard import (
+    fetch_category_embeddings,
+    iter_thread_embeddings,
+    fetch_uncategorized_embeddings,
+    update_query_categories,
+)
+from src.database.settings import get_app_setting, set_app_setting
+from src.config import logger
+
+CATEGORY_SET_VERSION = "category_set_version"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def category_set_version(names: List[str], embeddings: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.encode("utf-8") + b"\0")
+    digest.update(np.asarray(embeddings, dtype="<f4").tobytes())
+    return digest.hexdigest()
+
+
+class CategoryClassifier:
+    def __init__(self):
+        """
+        Assigns query embeddings to their nearest category by cosine similarity.
+
+        The category matrix is read from category_embeddings on first use and kept in memory,
+        so classifying any number of threads is a single matrix multiply plus argmax.
+        """
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._matrix = None
+        self.version = None
+
+    def load(self, db: TiDBHandler):
+        names, embeddings = fetch_category_embeddings(db)
+        matrix = normalize_rows(embeddings) if len(names) else None
+        with self._lock:
+            self._names, self._matrix = names, matrix
+            self.version = category_set_version(names, embeddings)
+        logger.info(f"[Categories] Loaded {len(names)} category embeddings")
+
+    def classify(self, embeddings: np.ndarray, db: TiDBHandler) -> List[str]:
+        """
+        Returns the best matching category name for each row of `embeddings`.
+        """
+        if self._matrix is None:
+            self.load(db)
+        with self._lock:
+            names, matrix = self._names, self._matrix
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if matrix is None or embeddings.size == 0:
+            return [None] * len(embeddings)
+
+        similarities = normalize_rows(embeddings) @ matrix.T
+        return [names[i] for i in np.argmax(similarities, axis=1)]
+
+
+category_classifier = CategoryClassifier()
+
+
+def classify_queries(embeddings: np.ndarray, db: TiDBHandler) -> List[str]:
+    return category_classifier.classify(embeddings, db)
+
+
+def categorize_threads(db: TiDBHandler) -> int:
+    """
+    Assigns categories to the threads that do not have one yet.
+
+    When category_embeddings has changed since the last run (its content hash differs
+    from the stamp stored in app_settings), every thread is reclassified instead.
+
+    Returns:
+    - The number of threads whose category was written.
+    """
+    category_classifier.load(db)
+    stored_version = get_app_setting(CATEGORY_SET_VERSION, db)
+    full = stored_version != category_classifier.version
+
+    if full:
+        logger.info("[Categories] Category set changed, reclassifying every thread")
+        batches = iter_thread_embeddings(db)
+    else:
+        batches = [fetch_uncategorized_embeddings(db)]
+
+    categorized = 0
+    for thread_ids, _, embeddings in batches:
+        if thread_ids:
+            categories = category_classifier.classify(embeddings, db)
+            update_query_categories(thread_ids, categories, db)
+            categorized += len(thread_ids)
+    if categorized:
+        logger.info(f"[Categories] Categorized {categorized} threads")
+
+    if full:
+        set_app_setting(CATEGORY_SET_VERSION, category_classifier.version, db)
+    return categorized
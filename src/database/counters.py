@@ -0,0 +1,110 @@
+from typing import List
+
+from src.database.tidb_handler import TiDBHandler
+from src.database.dashboard import get_aggregated_counts
+from src.database.sql_queries import (
+    SELECT_DASHBOARD_COUNTERS_QUERY,
+    ADJUST_DASHBOARD_COUNTERS_QUERY,
+    UPSERT_DASHBOARD_COUNTERS_QUERY,
+    INSERT_DASHBOARD_HISTORY_QUERY,
+    SELECT_COMPACTED_STATISTICS_QUERY,
+    ADD_COMPACTED_STATISTICS_QUERY,
+    COUNT_ROWS_STATISTICS_QUERY,
+    ROLLUP_DASHBOARD_COUNTERS_QUERY,
+)
+from src.config import logger
+
+COUNTER_KEYS = [
+    "queries_number",
+    "users_number",
+    "strategies_number",
+    "statistics_number",
+]
+
+
+def adjust_dashboard_counters(
+    cursor, threads: int = 0, users: int = 0, strategies: int = 0, statistics: int = 0
+):
+    """
+    Applies deltas to the running dashboard totals.
+
+    Takes the caller's cursor so the update commits (or rolls back) together with
+    the insert/delete it accounts for.
+    """
+    if not (threads or users or strategies or statistics):
+        return
+    cursor.execute(
+        ADJUST_DASHBOARD_COUNTERS_QUERY, (threads, users, strategies, statistics)
+    )
+
+
+def record_compacted_statistics(cursor, ids: List[int]):
+    """
+    Adds the statistics of processed_data rows about to be deleted by retention to
+    the compacted offset, so compaction does not lower the dashboard total.
+
+    Takes the caller's cursor so the offset commits together with the delete.
+    """
+    cursor.execute(
+        COUNT_ROWS_STATISTICS_QUERY.format(ids=", ".join(["%s"] * len(ids))), ids
+    )
+    statistics = int(cursor.fetchone()[0])
+    if statistics:
+        cursor.execute(ADD_COMPACTED_STATISTICS_QUERY, (statistics,))
+
+
+def rebuild_dashboard_counters(db: TiDBHandler, commit: bool = True):
+    """
+    Recomputes the running totals from full-table counts.
+
+    Statistics also include the compacted offset (see record_compacted_statistics),
+    so the total only drops when threads are deleted.
+    """
+    counts = get_aggregated_counts(db)
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_COMPACTED_STATISTICS_QUERY)
+        row = cursor.fetchone()
+    counts["statistics_number"] += int(row[0]) if row else 0
+    logger.info(f"[Dashboard] Rebuild dashboard counters: {counts}")
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_DASHBOARD_COUNTERS_QUERY, tuple(counts[key] for key in COUNTER_KEYS)
+        )
+    if commit:
+        db.connection.commit()
+    return counts
+
+
+def get_dashboard_counters(db: TiDBHandler):
+    """Returns the current totals and their change since the last daily rollup."""
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_DASHBOARD_COUNTERS_QUERY)
+        row = cursor.fetchone()
+
+    if row is None:
+        # First read on a fresh database: seed the row and measure diffs from now
+        counts = rebuild_dashboard_counters(db)
+        row = [counts[key] for key in COUNTER_KEYS] * 2
+
+    totals, previous = row[:4], row[4:]
+    counters = {key: int(value) for key, value in zip(COUNTER_KEYS, totals)}
+    for key, total, prev in zip(COUNTER_KEYS, totals, previous):
+        counters[f"diff_{key}"] = int(total) - int(prev)
+    return counters
+
+
+def rollup_dashboard_counters(db: TiDBHandler):
+    """
+    Daily rollup: reconciles the running totals against full counts, appends them
+    to the dashboard history table and makes them the baseline for the next day's diff.
+    """
+    logger.info(f"[Dashboard] Roll up dashboard counters")
+    try:
+        rebuild_dashboard_counters(db, commit=False)
+        with db.connection.cursor() as cursor:
+            cursor.execute(INSERT_DASHBOARD_HISTORY_QUERY)
+            cursor.execute(ROLLUP_DASHBOARD_COUNTERS_QUERY)
+        db.connection.commit()
+    except Exception:
+        db.connection.rollback()
+        raise
@@ -4,20 +4,18 @@ from src.database.sql_queries import (
     COUNT_ALL_STRATEGIES_QUERY,
     COUNT_ALL_STATISTICS_QUERY,
     SELECT_COUNTRY_QUERY,
-    INSERT_ALL_DASHBOARD_QUERY,
-    GET_PREVIOUS_DASHBOARD_QUERY,
     SELECT_QUERIES_TIMELINE_QUERY,
-    SELECT_ALL_QUERY,
-    MATCH_QUERY_TO_CATEGORY_QUERY,
-    GET_CATEGORY_EMBEDDINGS_QUERY,
+    SCAN_THREAD_EMBEDDINGS_QUERY,
+    SELECT_UNCATEGORIZED_QUERY,
+    SCAN_CATEGORY_EMBEDDINGS_QUERY,
     UPDATE_QUERY_CATEGORIES_QUERY,
     GET_TOP_CATEGORIES_QUERY,
 )
 from src.database import TiDBHandler
+from src.database.vectors import decode_vector
 import numpy as np
 import json
 from typing import Dict
-import pandas as pd
 from src.config import logger
 
 
@@ -43,52 +41,14 @@ def get_aggregated_counts(db: TiDBHandler):
     }
 
 
-def update_aggregated_counts(aggregated_counts: Dict, db: TiDBHandler):
-    with db.connection.cursor() as cursor:
-        cursor.execute(
-            INSERT_ALL_DASHBOARD_QUERY,
-            (
-                aggregated_counts["queries_number"],
-                aggregated_counts["users_number"],
-                aggregated_counts["strategies_number"],
-                aggregated_counts["statistics_number"],
-            ),
-        )
-    db.connection.commit()
-
-
-def retrieve_previous_aggregated_counts(db: TiDBHandler):
-    try:
-        result_df = db.execute_query_as_dict(GET_PREVIOUS_DASHBOARD_QUERY)[0]
-    except:
-        result_df = None
-    if result_df is None:
-        return {
-            "queries_number": 0,
-            "users_number": 0,
-            "strategies_number": 0,
-            "statistics_number": 0,
-        }
-    result_dict = {
-        "queries_number": int(result_df["total_thread_number"]),
-        "users_number": int(result_df["total_user_number"]),
-        "strategies_number": int(result_df["total_strategy_number"]),
-        "statistics_number": int(result_df["total_statistic_number"]),
-    }
-    return result_dict
-
-
 # Queries over time
 def get_queries_over_time(db: TiDBHandler):
-    result_df = db.execute_query_as_dict(SELECT_QUERIES_TIMELINE_QUERY)
-    result_df = pd.DataFrame(result_df)
-    result_df["creation_date"] = result_df["creation_date"].astype(
-        str
-    )  # Convert dates to strings
-    result_dict = result_df.to_dict(orient="records")
+    result = db.execute_query_as_dict(SELECT_QUERIES_TIMELINE_QUERY)
+    for row in result:
+        row["creation_date"] = str(row["creation_date"])  # Convert dates to strings
     db.connection.commit()  # Ensure any transaction is committed
 
-    return result_dict
+    return result
 
 
 def get_query_countries(db: TiDBHandler):
@@ -99,51 +59,77 @@ def get_query_countries(db: TiDBHandler):
     return result_dict
 
 
-# Fetch category embeddings
-def fetch_category_embeddings(db: TiDBHandler):
-    with db.connection.cursor() as cursor:
-        cursor.execute(GET_CATEGORY_EMBEDDINGS_QUERY)
-        result = cursor.fetchall()
+def stack_batches(batches):
+    return np.concatenate(batches) if batches else np.array([])
 
-    category_names = [row[0] for row in result]
-    category_embeddings = np.array(
-        [json.loads(row[1]) for row in result]
-    )  # Convert JSON to list of floats
 
-    return category_names, category_embeddings
+# Fetch category embeddings
+def fetch_category_embeddings(db: TiDBHandler, batch_size: int = 1000):
+    category_names, batches = [], []
+    # category_embeddings ids may be UUID strings (vector indexer) or integers
+    for rows in db.scan(SCAN_CATEGORY_EMBEDDINGS_QUERY, batch_size=batch_size, start=""):
+        category_names += [row[1] for row in rows]
+        batches.append(
+            np.array([decode_vector(row[2]) for row in rows])
+        )  # Convert vector text to float32 arrays
 
+    return category_names, stack_batches(batches)
 
-# Fetch all embeddings
-def fetch_all_embeddings(db: TiDBHandler):
-    with db.connection.cursor() as cursor:
-        cursor.execute(SELECT_ALL_QUERY)
-        result = cursor.fetchall()
 
-    thread_ids = [row[0] for row in result if row[1] != ""]
-    queries = [row[1] for row in result if row[1] != ""]
-    embeddings = np.array(
-        [json.loads(row[2]) for row in result if row[1] != ""]
-    )  # Convert string to list of floats
+# Stream thread embeddings in bounded batches of (thread_ids, queries, embeddings)
+def iter_thread_embeddings(db: TiDBHandler, batch_size: int = 1000):
+    for rows in db.scan(SCAN_THREAD_EMBEDDINGS_QUERY, batch_size=batch_size):
+        thread_ids, queries, embeddings = rows_to_embeddings(rows)
+        if thread_ids:
+            yield thread_ids, queries, embeddings
 
-    return thread_ids, queries, embeddings
 
+# Fetch all embeddings; vector text is decoded one batch at a time
+def fetch_all_embeddings(db: TiDBHandler, batch_size: int = 1000):
+    thread_ids, queries, batches = [], [], []
+    for batch_ids, batch_queries, embeddings in iter_thread_embeddings(db, batch_size):
+        thread_ids += batch_ids
+        queries += batch_queries
+        batches.append(embeddings)
+
+    return thread_ids, queries, stack_batches(batches)
 
-# Match query to category using vector search
-def match_query_to_category(db: TiDBHandler, query_embedding: np.array):
-    query_embedding_str = json.dumps(query_embedding.tolist())
 
+# Fetch embeddings of the threads that have no category yet
+def fetch_uncategorized_embeddings(db: TiDBHandler):
     with db.connection.cursor() as cursor:
-        cursor.execute(MATCH_QUERY_TO_CATEGORY_QUERY, (query_embedding_str,))
-        result = cursor.fetchone()
+        cursor.execute(SELECT_UNCATEGORIZED_QUERY)
+        result = cursor.fetchall()
+
+    return rows_to_embeddings(result)
+
 
-    return result[0] if result else None
+def rows_to_embeddings(result):
+    result = [row for row in result if row[1] != "" and row[2] is not None]
+    thread_ids = [row[0] for row in result]
+    queries = [row[1] for row in result]
+    embeddings = np.array(
+        [decode_vector(row[2]) for row in result]
+    )  # Convert vector text to float32 arrays
+
+    return thread_ids, queries, embeddings
 
 
-# Update query categories in the database
-def update_query_categories(thread_ids, categories, db: TiDBHandler):
+# Update query categories in the database, one CASE statement per chunk of threads
+def update_query_categories(
+    thread_ids, categories, db: TiDBHandler, chunk_size: int = 500
+):
+    assignments = list(zip(thread_ids, categories))
     with db.connection.cursor() as cursor:
-        for thread_id, category in zip(thread_ids, categories):
-            cursor.execute(UPDATE_QUERY_CATEGORIES_QUERY, (category, thread_id))
+        for start in range(0, len(assignments), chunk_size):
+            chunk = assignments[start : start + chunk_size]
+            query = UPDATE_QUERY_CATEGORIES_QUERY.format(
+                cases=" ".join(["WHEN %s THEN %s"] * len(chunk)),
+                ids=", ".join(["%s"] * len(chunk)),
+            )
+            params = [value for assignment in chunk for value in assignment]
+            params += [thread_id for thread_id, _ in chunk]
+            cursor.execute(query, params)
     db.connection.commit()
 
 
@@ -0,0 +1,33 @@
+from src.database.init_tidb import tidb_session
+from src.database.interest_points import upsert_interest_points
+from src.database.init_db.sql_queries import SCAN_LATEST_INTEREST_OVER_TIME_SQL
+from src.utils.data_generator.trend_data import TrendData
+from src.config import logger
+
+BATCH_SIZE = 200
+
+
+def backfill_interest_points(batch_size: int = BATCH_SIZE):
+    """
+    Seeds interest_points from each thread's latest raw_data row.
+
+    Safe to re-run: points are upserted, and later refreshes keep the history current.
+    """
+    written = 0
+    with tidb_session() as db:
+        for rows in db.scan(SCAN_LATEST_INTEREST_OVER_TIME_SQL, batch_size=batch_size):
+            with db.connection.cursor() as cursor:
+                for thread_id, interest_over_time, payload in rows:
+                    trend_data = TrendData.from_row(
+                        {"InterestOverTime": interest_over_time, "payload": payload}
+                    )
+                    written += upsert_interest_points(
+                        cursor, [thread_id], trend_data.get("InterestOverTime")
+                    )
+            db.connection.commit()
+    logger.info(f"[Migration] Backfilled {written} interest points")
+    print("Interest points backfilled successfully")
+
+
+if __name__ == "__main__":
+    backfill_interest_points()
@@ -1,5 +1,5 @@
 import asyncio
-from src.database.init_tidb import init_tidb
+from src.database.init_tidb import tidb_session
 from src.database.init_db.sql_queries import (
     CREATE_USER_TABLE_SQL,
     CREATE_THREADS_TABLE_SQL,
@@ -9,22 +9,67 @@ from src.database.init_db.sql_queries import (
     CREATE_STATISTIC_SNAPSHOT_TABLE_SQL,
     CREATE_STRATEGIES_TABLE_SQL,
     CREATE_DASHBOARD_TABLE_SQL,
-    CREATE_CAEGORY_EMBEDDINGS_TABLE_SQL,
+    CREATE_DASHBOARD_COUNTERS_TABLE_SQL,
+    CREATE_THREAD_JOBS_TABLE_SQL,
+    CREATE_APP_SETTINGS_TABLE_SQL,
+    CREATE_PROJECTION_MODELS_TABLE_SQL,
+    CREATE_QUERY_PROJECTIONS_TABLE_SQL,
+    CREATE_REFRESH_RUNS_TABLE_SQL,
+    CREATE_REFRESH_CHECKPOINTS_TABLE_SQL,
+    CREATE_THREAD_REFRESH_STATE_TABLE_SQL,
+    CREATE_INTEREST_POINTS_TABLE_SQL,
+    ADD_RAW_DATA_PAYLOAD_COLUMN_SQL,
+    ADD_RAW_DATA_FIELD_HASHES_COLUMN_SQL,
+    ADD_RAW_DATA_CONTENT_HASH_COLUMN_SQL,
+    ADD_PROCESSED_DATA_CONTENT_HASH_COLUMN_SQL,
+    ADD_REFRESH_RUNS_ITEMS_HASH_COLUMN_SQL,
+    ADD_DASHBOARD_COMPACTED_STATISTICS_COLUMN_SQL,
+    ADD_RAW_DATA_THREAD_CREATED_INDEX_SQL,
+    ADD_PROCESSED_DATA_THREAD_CREATED_INDEX_SQL,
 )
 
+# category_embeddings is created by the vector indexer (src/database/vector_search)
+CREATE_TABLE_STATEMENTS = [
+    CREATE_USER_TABLE_SQL,
+    CREATE_THREADS_TABLE_SQL,
+    CREATE_RAW_DATA_TABLE_SQL,
+    CREATE_PROCESSED_DATA_TABLE_SQL,
+    CREATE_THREAD_SNAPSHOTS_TABLE_SQL,
+    CREATE_STATISTIC_SNAPSHOT_TABLE_SQL,
+    CREATE_STRATEGIES_TABLE_SQL,
+    CREATE_DASHBOARD_TABLE_SQL,
+    CREATE_DASHBOARD_COUNTERS_TABLE_SQL,
+    CREATE_THREAD_JOBS_TABLE_SQL,
+    CREATE_APP_SETTINGS_TABLE_SQL,
+    CREATE_PROJECTION_MODELS_TABLE_SQL,
+    CREATE_QUERY_PROJECTIONS_TABLE_SQL,
+    CREATE_REFRESH_RUNS_TABLE_SQL,
+    CREATE_REFRESH_CHECKPOINTS_TABLE_SQL,
+    CREATE_THREAD_REFRESH_STATE_TABLE_SQL,
+    CREATE_INTEREST_POINTS_TABLE_SQL,
+    # Columns and indexes added after the first release; no-ops on fresh tables
+    ADD_RAW_DATA_PAYLOAD_COLUMN_SQL,
+    ADD_RAW_DATA_FIELD_HASHES_COLUMN_SQL,
+    ADD_RAW_DATA_CONTENT_HASH_COLUMN_SQL,
+    ADD_PROCESSED_DATA_CONTENT_HASH_COLUMN_SQL,
+    ADD_REFRESH_RUNS_ITEMS_HASH_COLUMN_SQL,
+    ADD_DASHBOARD_COMPACTED_STATISTICS_COLUMN_SQL,
+    ADD_RAW_DATA_THREAD_CREATED_INDEX_SQL,
+    ADD_PROCESSED_DATA_THREAD_CREATED_INDEX_SQL,
+]
+
 
 async def initialize_database():
-    db = init_tidb()
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute(CREATE_STRATEGIES_TABLE_SQL)
-            db.connection.commit()
+        with tidb_session() as db:
+            with db.connection.cursor() as cursor:
+                for statement in CREATE_TABLE_STATEMENTS:
+                    cursor.execute(statement)
+                db.connection.commit()
 
         print("Tables created successfully")
     except Exception as e:
         print(f"Error creating tables: {e}")
-    finally:
-        db.connection.close()
 
 
 if __name__ == "__main__":
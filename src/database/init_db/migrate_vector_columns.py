@@ -0,0 +1,116 @@
+import argparse
+
+from src.database.init_tidb import tidb_session
+from src.database import TiDBHandler
+from src.database.init_db.sql_queries import (
+    SELECT_COLUMN_TYPE_SQL,
+    ADD_VECTOR_COLUMN_SQL,
+    SELECT_MAX_ID_SQL,
+    BACKFILL_VECTOR_COLUMN_SQL,
+    SELECT_UNCONVERTED_IDS_SQL,
+    DROP_JSON_COLUMN_SQL,
+    RENAME_VECTOR_COLUMN_SQL,
+    SET_TIFLASH_REPLICA_SQL,
+    ADD_HNSW_INDEX_SQL,
+)
+from src.config import logger
+
+EMBEDDING_COLUMNS = ["query_embeddings", "keywords_embeddings"]
+BATCH_SIZE = 500
+
+
+def column_type(db: TiDBHandler, table: str, column: str):
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_COLUMN_TYPE_SQL, (table, column))
+        row = cursor.fetchone()
+    return row[0].lower() if row else None
+
+
+def migrate_column(
+    db: TiDBHandler, table: str, column: str, batch_size: int, force: bool = False
+):
+    """
+    Converts a JSON embedding column to VECTOR(1536) in place.
+
+    The new column is backfilled server-side with VEC_FROM_TEXT in id ranges of
+    `batch_size` rows, so no vector is parsed in Python and each transaction stays small.
+    Rows whose JSON is not a 1536-element array are left NULL, and the JSON column is
+    only dropped if there are none, unless `force` is set; otherwise the migration stops
+    and logs their ids, leaving both columns in place.
+    """
+    if column_type(db, table, column) == "vector":
+        logger.info(f"[Migration] {table}.{column} is already a VECTOR column")
+        return
+
+    with db.connection.cursor() as cursor:
+        if column_type(db, table, f"{column}_vec") is None:
+            cursor.execute(ADD_VECTOR_COLUMN_SQL.format(table=table, column=column))
+
+        cursor.execute(SELECT_MAX_ID_SQL.format(table=table))
+        max_id = cursor.fetchone()[0]
+
+        migrated = 0
+        for start in range(0, max_id, batch_size):
+            cursor.execute(
+                BACKFILL_VECTOR_COLUMN_SQL.format(table=table, column=column),
+                (start, start + batch_size),
+            )
+            db.connection.commit()
+            migrated += cursor.rowcount
+        logger.info(f"[Migration] Backfilled {migrated} rows of {table}.{column}")
+
+        cursor.execute(SELECT_UNCONVERTED_IDS_SQL.format(table=table, column=column))
+        unconverted = [row[0] for row in cursor.fetchall()]
+        if unconverted:
+            logger.error(
+                f"[Migration] {len(unconverted)} rows of {table}.{column} could not be "
+                f"converted to VECTOR(1536), ids: {unconverted}"
+            )
+            if not force:
+                raise RuntimeError(
+                    f"Refusing to drop {table}.{column}: {len(unconverted)} rows were "
+                    "not converted (rerun with --force to drop them anyway)"
+                )
+
+        cursor.execute(DROP_JSON_COLUMN_SQL.format(table=table, column=column))
+        cursor.execute(RENAME_VECTOR_COLUMN_SQL.format(table=table, column=column))
+        db.connection.commit()
+
+
+def add_hnsw_index(db: TiDBHandler, table: str, column: str, index: str):
+    # Vector indexes are built on TiFlash, so the table needs a replica first
+    with db.connection.cursor() as cursor:
+        cursor.execute(SET_TIFLASH_REPLICA_SQL.format(table=table))
+        try:
+            cursor.execute(
+                ADD_HNSW_INDEX_SQL.format(table=table, column=column, index=index)
+            )
+        except Exception as e:
+            if "Duplicate key name" not in str(e):
+                raise
+            logger.info(f"[Migration] Index {index} already exists")
+        db.connection.commit()
+
+
+def migrate_vector_columns(batch_size: int = BATCH_SIZE, force: bool = False):
+    with tidb_session() as db:
+        for column in EMBEDDING_COLUMNS:
+            migrate_column(db, "threads", column, batch_size, force=force)
+        add_hnsw_index(
+            db, "threads", "query_embeddings", "idx_threads_query_embeddings"
+        )
+    print("Embedding columns migrated successfully")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert the threads embedding columns from JSON to VECTOR(1536)"
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="drop the JSON columns even if some rows could not be converted",
+    )
+    args = parser.parse_args()
+    migrate_vector_columns(args.batch_size, force=args.force)
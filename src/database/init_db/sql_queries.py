@@ -15,12 +15,13 @@ CREATE_THREADS_TABLE_SQL = """
         user_id INT NOT NULL,
         name VARCHAR(255) NOT NULL,
         query TEXT DEFAULT NULL,
-        query_embeddings JSON DEFAULT NULL,
+        query_embeddings VECTOR(1536) DEFAULT NULL,
         keywords JSON DEFAULT NULL,
-        keywords_embeddings JSON DEFAULT NULL,
+        keywords_embeddings VECTOR(1536) DEFAULT NULL,
         category VARCHAR(255) DEFAULT NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        VECTOR INDEX idx_threads_query_embeddings ((VEC_COSINE_DISTANCE(query_embeddings))) USING HNSW
     );
 """
 
@@ -37,6 +38,10 @@ CREATE_RAW_DATA_TABLE_SQL = """
         RelatedQueries JSON,
         YouTubeSearch JSON,
         ShoppingResults JSON,
+        payload LONGBLOB,
+        field_hashes JSON,
+        content_hash CHAR(32),
+        KEY idx_raw_data_thread_created (thread_id, created_date),
         FOREIGN KEY (thread_id) REFERENCES threads(id) ON DELETE CASCADE
     );
 """
@@ -54,6 +59,8 @@ CREATE_PROCESSED_DATA_TABLE_SQL = """
         RelatedQueries JSON,
         YouTubeSearch JSON,
         ShoppingResults JSON,
+        content_hash CHAR(32),
+        KEY idx_processed_data_thread_created (thread_id, created_date),
         FOREIGN KEY (thread_id) REFERENCES threads(id) ON DELETE CASCADE
     );
     """
@@ -104,6 +111,154 @@ CREATE TABLE IF NOT EXISTS strategy_snapshots (
     );
 """
 
+## App settings (version stamps and other small key/value state)
+CREATE_APP_SETTINGS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS app_settings (
+        name VARCHAR(64) PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+"""
+
+## Columns and indexes added to existing raw_data / processed_data tables
+# New raw_data rows keep their sources zstd-compressed in payload, with per-field hashes;
+# content_hash lets an unchanged refresh skip the insert
+ADD_RAW_DATA_PAYLOAD_COLUMN_SQL = """
+    ALTER TABLE raw_data ADD COLUMN IF NOT EXISTS payload LONGBLOB;
+"""
+
+ADD_RAW_DATA_FIELD_HASHES_COLUMN_SQL = """
+    ALTER TABLE raw_data ADD COLUMN IF NOT EXISTS field_hashes JSON;
+"""
+
+ADD_RAW_DATA_CONTENT_HASH_COLUMN_SQL = """
+    ALTER TABLE raw_data ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+"""
+
+ADD_PROCESSED_DATA_CONTENT_HASH_COLUMN_SQL = """
+    ALTER TABLE processed_data ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+"""
+
+# Statistics of processed_data rows removed by retention, still counted on the dashboard
+ADD_DASHBOARD_COMPACTED_STATISTICS_COLUMN_SQL = """
+    ALTER TABLE dashboard_counters
+    ADD COLUMN IF NOT EXISTS compacted_statistic_number BIGINT NOT NULL DEFAULT 0;
+"""
+
+# Identifies the set of threads a refresh run was started for, so only the same set resumes it
+ADD_REFRESH_RUNS_ITEMS_HASH_COLUMN_SQL = """
+    ALTER TABLE refresh_runs ADD COLUMN IF NOT EXISTS items_hash CHAR(32);
+"""
+
+# Latest-row lookups (ORDER BY created_date DESC LIMIT 1) and retention range scans
+ADD_RAW_DATA_THREAD_CREATED_INDEX_SQL = """
+    ALTER TABLE raw_data
+    ADD INDEX IF NOT EXISTS idx_raw_data_thread_created (thread_id, created_date);
+"""
+
+ADD_PROCESSED_DATA_THREAD_CREATED_INDEX_SQL = """
+    ALTER TABLE processed_data
+    ADD INDEX IF NOT EXISTS idx_processed_data_thread_created (thread_id, created_date);
+"""
+
+## Background jobs
+CREATE_THREAD_JOBS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS thread_jobs (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        user_id INT NOT NULL,
+        user_query TEXT NOT NULL,
+        country VARCHAR(255) NOT NULL,
+        status VARCHAR(32) NOT NULL DEFAULT 'queued',
+        stage VARCHAR(64) DEFAULT NULL,
+        progress INT NOT NULL DEFAULT 0,
+        thread_id INT DEFAULT NULL,
+        error TEXT DEFAULT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        KEY idx_thread_jobs_status (status),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+"""
+
+## Scheduled refresh runs and their per-thread checkpoints
+CREATE_REFRESH_RUNS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS refresh_runs (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        status VARCHAR(32) NOT NULL DEFAULT 'running',
+        total INT NOT NULL DEFAULT 0,
+        succeeded INT NOT NULL DEFAULT 0,
+        failed INT NOT NULL DEFAULT 0,
+        skipped INT NOT NULL DEFAULT 0,
+        items_hash CHAR(32) DEFAULT NULL,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP NULL DEFAULT NULL,
+        KEY idx_refresh_runs_status (status)
+    );
+"""
+
+CREATE_REFRESH_CHECKPOINTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS refresh_checkpoints (
+        run_id INT NOT NULL,
+        thread_id INT NOT NULL,
+        status VARCHAR(32) NOT NULL,
+        attempts INT NOT NULL DEFAULT 0,
+        error TEXT DEFAULT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, thread_id),
+        FOREIGN KEY (run_id) REFERENCES refresh_runs(id) ON DELETE CASCADE
+    );
+"""
+
+# Per-thread view activity and refresh schedule used by the priority scheduler
+CREATE_THREAD_REFRESH_STATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS thread_refresh_state (
+        thread_id INT PRIMARY KEY,
+        last_accessed_at TIMESTAMP NULL DEFAULT NULL,
+        access_count INT NOT NULL DEFAULT 0,
+        volatility FLOAT DEFAULT NULL,
+        last_refreshed_at TIMESTAMP NULL DEFAULT NULL,
+        next_refresh_at TIMESTAMP NULL DEFAULT NULL,
+        KEY idx_thread_refresh_state_next (next_refresh_at),
+        FOREIGN KEY (thread_id) REFERENCES threads(id) ON DELETE CASCADE
+    );
+"""
+
+## Interest Over Time history, one row per thread, keyword and period
+CREATE_INTEREST_POINTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS interest_points (
+        thread_id INT NOT NULL,
+        keyword VARCHAR(255) NOT NULL,
+        ts DATETIME NOT NULL,
+        value INT DEFAULT NULL,
+        PRIMARY KEY (thread_id, keyword, ts),
+        FOREIGN KEY (thread_id) REFERENCES threads(id) ON DELETE CASCADE
+    );
+"""
+
+## Query embedding projections
+CREATE_PROJECTION_MODELS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS projection_models (
+        version VARCHAR(64) PRIMARY KEY,
+        n_samples INT NOT NULL,
+        mean LONGBLOB NOT NULL,
+        components LONGBLOB NOT NULL,
+        centroids LONGBLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+CREATE_QUERY_PROJECTIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS query_projections (
+        thread_id INT PRIMARY KEY,
+        x FLOAT NOT NULL,
+        y FLOAT NOT NULL,
+        cluster_id INT,
+        model_version VARCHAR(64) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (thread_id) REFERENCES threads(id) ON DELETE CASCADE
+    );
+"""
+
 ### Dashboard
 CREATE_DASHBOARD_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS dashboard (
@@ -115,6 +270,24 @@ CREATE TABLE IF NOT EXISTS dashboard (
     total_statistic_number INT);
 """
 
+# Single row (id = 1) of running totals, kept up to date by the write paths;
+# previous_* holds the totals captured by the last daily rollup
+CREATE_DASHBOARD_COUNTERS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    id TINYINT PRIMARY KEY,
+    total_thread_number BIGINT NOT NULL DEFAULT 0,
+    total_user_number BIGINT NOT NULL DEFAULT 0,
+    total_strategy_number BIGINT NOT NULL DEFAULT 0,
+    total_statistic_number BIGINT NOT NULL DEFAULT 0,
+    previous_thread_number BIGINT NOT NULL DEFAULT 0,
+    previous_user_number BIGINT NOT NULL DEFAULT 0,
+    previous_strategy_number BIGINT NOT NULL DEFAULT 0,
+    previous_statistic_number BIGINT NOT NULL DEFAULT 0,
+    compacted_statistic_number BIGINT NOT NULL DEFAULT 0,
+    rolled_up_at TIMESTAMP NULL DEFAULT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP);
+"""
+
 
 CREATE_CAEGORY_EMBEDDINGS_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS category_embeddings (
@@ -122,3 +295,61 @@ CREATE TABLE IF NOT EXISTS category_embeddings (
     category_name VARCHAR(255) NOT NULL,
     category_embedding JSON NOT NULL
 );"""
+
+
+## Migrations: JSON embeddings -> VECTOR(1536)
+SELECT_COLUMN_TYPE_SQL = """
+    SELECT DATA_TYPE
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s;
+"""
+
+ADD_VECTOR_COLUMN_SQL = """
+    ALTER TABLE {table} ADD COLUMN {column}_vec VECTOR(1536) DEFAULT NULL;
+"""
+
+SELECT_MAX_ID_SQL = """
+    SELECT COALESCE(MAX(id), 0) FROM {table};
+"""
+
+BACKFILL_VECTOR_COLUMN_SQL = """
+    UPDATE {table}
+    SET {column}_vec = VEC_FROM_TEXT(CAST({column} AS CHAR))
+    WHERE id > %s AND id <= %s
+        AND {column} IS NOT NULL
+        AND JSON_LENGTH({column}) = 1536;
+"""
+
+SELECT_UNCONVERTED_IDS_SQL = """
+    SELECT id FROM {table}
+    WHERE {column} IS NOT NULL AND {column}_vec IS NULL
+    ORDER BY id;
+"""
+
+DROP_JSON_COLUMN_SQL = """
+    ALTER TABLE {table} DROP COLUMN {column};
+"""
+
+RENAME_VECTOR_COLUMN_SQL = """
+    ALTER TABLE {table} RENAME COLUMN {column}_vec TO {column};
+"""
+
+SET_TIFLASH_REPLICA_SQL = """
+    ALTER TABLE {table} SET TIFLASH REPLICA 1;
+"""
+
+ADD_HNSW_INDEX_SQL = """
+    ALTER TABLE {table}
+    ADD VECTOR INDEX {index} ((VEC_COSINE_DISTANCE({column}))) USING HNSW;
+"""
+
+SCAN_LATEST_INTEREST_OVER_TIME_SQL = """
+    SELECT t.id, r.InterestOverTime, r.payload
+    FROM threads t
+    LEFT JOIN raw_data r ON r.id = (
+        SELECT MAX(r2.id) FROM raw_data r2 WHERE r2.thread_id = t.id
+    )
+    WHERE t.id > %s
+    ORDER BY t.id
+    LIMIT %s;
+"""
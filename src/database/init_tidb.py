@@ -1,6 +1,52 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
 from src.database.tidb_handler import TiDBHandler
-from src.config import TIDB_CREDENTIAL
+from src.database.tidb_pool import TiDBConnectionPool
+from src.config import (
+    TIDB_CREDENTIAL,
+    TIDB_POOL_SIZE,
+    TIDB_POOL_MAX_OVERFLOW,
+    TIDB_POOL_TIMEOUT,
+    TIDB_POOL_RECYCLE,
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_tidb_pool() -> TiDBConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TiDBConnectionPool(
+                    TIDB_CREDENTIAL,
+                    pool_size=TIDB_POOL_SIZE,
+                    max_overflow=TIDB_POOL_MAX_OVERFLOW,
+                    timeout=TIDB_POOL_TIMEOUT,
+                    recycle=TIDB_POOL_RECYCLE,
+                )
+    return _pool
+
+
+@contextmanager
+def tidb_session() -> Iterator[TiDBHandler]:
+    """
+    Check a pooled connection out for the duration of the block and return it afterwards.
+    """
+    pool = get_tidb_pool()
+    connection = pool.checkout()
+    try:
+        yield TiDBHandler(connection)
+    finally:
+        pool.checkin(connection)
 
 
-def init_tidb() -> TiDBHandler:
-    return TiDBHandler(TIDB_CREDENTIAL)
+def init_tidb() -> Iterator[TiDBHandler]:
+    """
+    FastAPI dependency yielding a TiDBHandler bound to a pooled connection for one request.
+    """
+    with tidb_session() as db:
+        yield db
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from src.database.tidb_handler import TiDBHandler
+from src.database.sql_queries import (
+    UPSERT_INTEREST_POINTS_QUERY,
+    SELECT_INTEREST_POINTS_QUERY,
+)
+from src.config import logger
+
+EARLIEST = datetime(1970, 1, 1)
+LATEST = datetime(9999, 12, 31)
+# Last second representable as a datetime (9999-12-31 23:59:59 UTC)
+MAX_UNIX_SECONDS = 253402300799
+
+
+def from_unix(seconds: int) -> datetime:
+    return datetime.fromtimestamp(int(seconds), tz=timezone.utc).replace(tzinfo=None)
+
+
+def to_unix(ts: datetime) -> int:
+    return int(ts.replace(tzinfo=timezone.utc).timestamp())
+
+
+def interest_points_from_records(
+    records: Optional[List[Dict]],
+) -> List[Tuple[str, datetime, Optional[int]]]:
+    """
+    Unpivots wide InterestOverTime records ({"Date", "Timestamp", <keyword>: value})
+    into (keyword, ts, value) points. Periods without a usable timestamp are skipped.
+    """
+    points = []
+    for record in records or []:
+        try:
+            ts = from_unix(record["Timestamp"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        for keyword, value in record.items():
+            if keyword not in ("Date", "Timestamp"):
+                points.append((keyword, ts, value))
+    return points
+
+
+def upsert_interest_points(
+    cursor,
+    thread_ids: List[int],
+    interest_over_time: Optional[List[Dict]],
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Merges a refreshed InterestOverTime window into the threads' point history.
+
+    Takes the caller's cursor so the points commit together with the raw data they
+    come from. Returns the number of rows written.
+    """
+    points = interest_points_from_records(interest_over_time)
+    rows = [(thread_id, *point) for thread_id in thread_ids for point in points]
+    for start in range(0, len(rows), chunk_size):
+        cursor.executemany(
+            UPSERT_INTEREST_POINTS_QUERY, rows[start : start + chunk_size]
+        )
+    return len(rows)
+
+
+def fetch_interest_points(
+    thread_id: int,
+    db: TiDBHandler,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    keywords: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, List]]:
+    """
+    Interest Over Time history of a thread between start and end (inclusive, UTC).
+
+    Returns:
+    - {keyword: {"timestamps": [unix seconds, ...], "values": [...]}}, ordered by time.
+    """
+    logger.info(
+        f"[TIDB] Retrieve interest points with thread id: {thread_id}, {start} - {end}"
+    )
+    keyword_filter = (
+        f"AND keyword IN ({', '.join(['%s'] * len(keywords))})" if keywords else ""
+    )
+    params = (thread_id, start or EARLIEST, end or LATEST, *(keywords or []))
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            SELECT_INTEREST_POINTS_QUERY.format(keywords=keyword_filter), params
+        )
+        result = cursor.fetchall()
+
+    series = {}
+    for keyword, ts, value in result:
+        columns = series.setdefault(keyword, {"timestamps": [], "values": []})
+        columns["timestamps"].append(to_unix(ts))
+        columns["values"].append(value)
+    return series
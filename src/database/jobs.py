@@ -0,0 +1,82 @@
+from fastapi import HTTPException
+
+from src.database.tidb_handler import TiDBHandler
+from src.database.sql_queries import (
+    INSERT_THREAD_JOB_QUERY,
+    UPDATE_THREAD_JOB_QUERY,
+    FAIL_THREAD_JOB_QUERY,
+    SELECT_THREAD_JOB_QUERY,
+    FAIL_INTERRUPTED_THREAD_JOBS_QUERY,
+)
+
+from src.config import logger  # Import the logger
+
+
+def create_thread_job(user_id: int, user_query: str, country: str, db: TiDBHandler):
+    logger.info(f"[TIDB] Create thread job for user id: {user_id}")
+    try:
+        with db.connection.cursor() as cursor:
+            cursor.execute(INSERT_THREAD_JOB_QUERY, (user_id, user_query, country))
+            db.connection.commit()
+            return cursor.lastrowid
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def update_thread_job(
+    job_id: int,
+    status: str,
+    stage: str,
+    progress: int,
+    db: TiDBHandler,
+    thread_id: int = None,
+    error: str = None,
+):
+    logger.info(f"[TIDB] Update thread job {job_id}: {status}, {stage}, {progress}%")
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            UPDATE_THREAD_JOB_QUERY, (status, stage, progress, thread_id, error, job_id)
+        )
+        db.connection.commit()
+
+
+def fail_thread_job(job_id: int, error: str, db: TiDBHandler):
+    """Marks a job as failed and detaches it from the thread it had created, which is removed."""
+    logger.info(f"[TIDB] Fail thread job {job_id}: {error}")
+    with db.connection.cursor() as cursor:
+        cursor.execute(FAIL_THREAD_JOB_QUERY, (error, job_id))
+        db.connection.commit()
+
+
+def fetch_thread_job(job_id: int, db: TiDBHandler):
+    logger.info(f"[TIDB] Retrieve thread job with job id: {job_id}")
+    try:
+        with db.connection.cursor() as cursor:
+            cursor.execute(SELECT_THREAD_JOB_QUERY, (job_id,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+
+        if row is None:
+            return None
+
+        job = dict(zip(columns, row))
+        job["created_at"] = str(job["created_at"])
+        job["updated_at"] = str(job["updated_at"])
+        return job
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def fail_interrupted_thread_jobs(db: TiDBHandler):
+    """
+    Marks jobs left queued or running by a previous process as failed.
+    The in-process queue does not survive a restart, so nothing would ever finish them.
+    """
+    with db.connection.cursor() as cursor:
+        cursor.execute(FAIL_INTERRUPTED_THREAD_JOBS_QUERY)
+        db.connection.commit()
+        if cursor.rowcount:
+            logger.warning(
+                f"[TIDB] Marked {cursor.rowcount} interrupted thread jobs as failed"
+            )
+        return cursor.rowcount
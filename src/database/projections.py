@@ -0,0 +1,169 @@
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.database import TiDBHandler
+from src.database.dashboard import fetch_all_embeddings, rows_to_embeddings
+from src.database.settings import get_app_setting, set_app_setting
+from src.database.sql_queries import (
+    SELECT_UNPROJECTED_QUERY,
+    COUNT_EMBEDDED_THREADS_QUERY,
+    SELECT_PROJECTION_MODEL_QUERY,
+    INSERT_PROJECTION_MODEL_QUERY,
+    DELETE_OTHER_PROJECTION_MODELS_QUERY,
+    UPSERT_QUERY_PROJECTION_QUERY,
+    SELECT_QUERY_PROJECTIONS_PAGE_QUERY,
+)
+from src.utils.projection.pca import fit_pca, project
+from src.utils.projection.kmeans import kmeans, assign_clusters
+from src.config import (
+    PROJECTION_CLUSTERS,
+    PROJECTION_CLUSTER_COMPONENTS,
+    PROJECTION_REFIT_GROWTH,
+    logger,
+)
+
+PROJECTION_MODEL_VERSION = "projection_model_version"
+
+
+def to_blob(matrix: np.ndarray) -> bytes:
+    return np.asarray(matrix, dtype="<f4").tobytes()
+
+
+def from_blob(blob: bytes, columns: int) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f4").reshape(-1, columns)
+
+
+# Fetch embeddings of the threads that have no projection yet
+def fetch_unprojected_embeddings(db: TiDBHandler):
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_UNPROJECTED_QUERY)
+        result = cursor.fetchall()
+
+    return rows_to_embeddings(result)
+
+
+def count_embedded_threads(db: TiDBHandler) -> int:
+    with db.connection.cursor() as cursor:
+        cursor.execute(COUNT_EMBEDDED_THREADS_QUERY)
+        return int(cursor.fetchone()[0])
+
+
+def fetch_projection_model(version: str, db: TiDBHandler) -> Optional[Dict]:
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_PROJECTION_MODEL_QUERY, (version,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    mean = np.frombuffer(row[2], dtype="<f4")
+    components = from_blob(row[3], len(mean))
+    return {
+        "version": row[0],
+        "n_samples": row[1],
+        "mean": mean,
+        "components": components,
+        "centroids": from_blob(row[4], len(components)),
+    }
+
+
+def upsert_projections(
+    thread_ids: List[int],
+    coordinates: np.ndarray,
+    clusters: np.ndarray,
+    version: str,
+    db: TiDBHandler,
+    chunk_size: int = 1000,
+):
+    rows = [
+        (thread_id, float(point[0]), float(point[1]), int(cluster), version)
+        for thread_id, point, cluster in zip(thread_ids, coordinates, clusters)
+    ]
+    with db.connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany(
+                UPSERT_QUERY_PROJECTION_QUERY, rows[start : start + chunk_size]
+            )
+    db.connection.commit()
+
+
+def fetch_projections_page(after: int, limit: int, db: TiDBHandler) -> List[Dict]:
+    """Keyset-paginated (thread_id, x, y, cluster, category) rows after a thread id."""
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_QUERY_PROJECTIONS_PAGE_QUERY, (after, limit))
+        result = cursor.fetchall()
+
+    return [
+        {
+            "thread_id": row[0],
+            "x": row[1],
+            "y": row[2],
+            "cluster": row[3],
+            "category": row[4],
+        }
+        for row in result
+    ]
+
+
+def refit_projections(db: TiDBHandler) -> int:
+    """
+    Fits a new PCA + k-means model on every thread and rewrites all projections.
+
+    Clusters are found on the first PROJECTION_CLUSTER_COMPONENTS principal components;
+    the stored x/y are the first two.
+    """
+    thread_ids, _, embeddings = fetch_all_embeddings(db)
+    if len(thread_ids) < 2:
+        return 0
+
+    n_components = min(PROJECTION_CLUSTER_COMPONENTS, len(thread_ids))
+    mean, components = fit_pca(embeddings, max(n_components, 2))
+    coordinates = project(embeddings, mean, components)
+    centroids, clusters = kmeans(coordinates, PROJECTION_CLUSTERS)
+
+    blobs = [to_blob(mean), to_blob(components), to_blob(centroids)]
+    version = hashlib.sha256(b"".join(blobs)).hexdigest()[:16]
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_PROJECTION_MODEL_QUERY, (version, len(thread_ids), *blobs)
+        )
+    upsert_projections(thread_ids, coordinates, clusters, version, db)
+
+    set_app_setting(PROJECTION_MODEL_VERSION, version, db)
+    with db.connection.cursor() as cursor:
+        cursor.execute(DELETE_OTHER_PROJECTION_MODELS_QUERY, (version,))
+    db.connection.commit()
+
+    logger.info(
+        f"[Projections] Fitted model {version} on {len(thread_ids)} threads "
+        f"({len(centroids)} clusters)"
+    )
+    return len(thread_ids)
+
+
+def refresh_projections(db: TiDBHandler) -> int:
+    """
+    Brings query_projections up to date.
+
+    New threads are projected with the stored model; the model is refitted from scratch
+    when there is none yet or the thread count has grown by PROJECTION_REFIT_GROWTH
+    since it was fitted.
+
+    Returns:
+    - The number of threads whose projection was written.
+    """
+    version = get_app_setting(PROJECTION_MODEL_VERSION, db)
+    model = fetch_projection_model(version, db) if version else None
+    if model is None or count_embedded_threads(db) > model["n_samples"] * (
+        1 + PROJECTION_REFIT_GROWTH
+    ):
+        return refit_projections(db)
+
+    thread_ids, _, embeddings = fetch_unprojected_embeddings(db)
+    if thread_ids:
+        coordinates = project(embeddings, model["mean"], model["components"])
+        clusters = assign_clusters(coordinates, model["centroids"])
+        upsert_projections(thread_ids, coordinates, clusters, model["version"], db)
+        logger.info(f"[Projections] Projected {len(thread_ids)} new threads")
+    return len(thread_ids)
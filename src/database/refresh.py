@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.database.tidb_handler import TiDBHandler
+from src.database.sql_queries import (
+    INSERT_REFRESH_RUN_QUERY,
+    SELECT_INTERRUPTED_REFRESH_RUN_QUERY,
+    SELECT_SUCCEEDED_CHECKPOINTS_QUERY,
+    UPSERT_REFRESH_CHECKPOINT_QUERY,
+    ABORT_REFRESH_RUN_QUERY,
+    FINISH_REFRESH_RUN_QUERY,
+    UPSERT_THREAD_ACCESS_QUERY,
+    SELECT_DUE_THREADS_QUERY,
+    UPSERT_THREAD_SCHEDULE_QUERY,
+    UPSERT_REFRESH_SUCCESS_QUERY,
+    UPSERT_REFRESH_FAILURE_QUERY,
+)
+from src.config import REFRESH_TIERS, REFRESH_RETRY_DELAY, logger
+
+
+def start_refresh_run(total: int, items_hash: str, db: TiDBHandler) -> int:
+    with db.connection.cursor() as cursor:
+        cursor.execute(INSERT_REFRESH_RUN_QUERY, (total, items_hash))
+        run_id = cursor.lastrowid
+    db.connection.commit()
+    logger.info(f"[Refresh] Started refresh run {run_id} for {total} threads")
+    return run_id
+
+
+def fetch_interrupted_refresh_run(db: TiDBHandler) -> Optional[Tuple[int, str]]:
+    """
+    Latest run still marked running, i.e. one whose process died before finishing,
+    as (run id, hash of the thread ids it was started for).
+    """
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_INTERRUPTED_REFRESH_RUN_QUERY)
+        row = cursor.fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def abort_refresh_run(run_id: int, db: TiDBHandler):
+    """Closes an interrupted run that will not be resumed."""
+    with db.connection.cursor() as cursor:
+        cursor.execute(ABORT_REFRESH_RUN_QUERY, (run_id,))
+    db.connection.commit()
+    logger.info(f"[Refresh] Aborted interrupted refresh run {run_id}")
+
+
+def fetch_succeeded_thread_ids(run_id: int, db: TiDBHandler) -> Set[int]:
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_SUCCEEDED_CHECKPOINTS_QUERY, (run_id,))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def record_refresh_checkpoints(
+    run_id: int,
+    thread_ids: List[int],
+    status: str,
+    attempts: int,
+    db: TiDBHandler,
+    error: str = None,
+):
+    with db.connection.cursor() as cursor:
+        cursor.executemany(
+            UPSERT_REFRESH_CHECKPOINT_QUERY,
+            [(run_id, thread_id, status, attempts, error) for thread_id in thread_ids],
+        )
+    db.connection.commit()
+
+
+def finish_refresh_run(run_id: int, summary: dict, db: TiDBHandler):
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            FINISH_REFRESH_RUN_QUERY,
+            (
+                summary["status"],
+                summary["total"],
+                summary["succeeded"],
+                summary["failed"],
+                summary["skipped"],
+                run_id,
+            ),
+        )
+    db.connection.commit()
+
+
+def record_thread_accesses(accesses: Dict[int, int], db: TiDBHandler):
+    """Adds view counts per thread and pulls idle threads back into the refresh schedule."""
+    query = UPSERT_THREAD_ACCESS_QUERY.format(
+        hot_interval=int(REFRESH_TIERS[0][1] * 3600)
+    )
+    with db.connection.cursor() as cursor:
+        cursor.executemany(query, list(accesses.items()))
+    db.connection.commit()
+
+
+def fetch_due_threads(db: TiDBHandler) -> List[Dict]:
+    """Threads whose next refresh time has passed, or that have no schedule yet."""
+    return db.execute_query_as_dict(SELECT_DUE_THREADS_QUERY)
+
+
+def schedule_thread_refreshes(schedule: List[Tuple], db: TiDBHandler):
+    """Stores (thread_id, last_refreshed_at, next_refresh_at); None means never."""
+    with db.connection.cursor() as cursor:
+        cursor.executemany(UPSERT_THREAD_SCHEDULE_QUERY, schedule)
+    db.connection.commit()
+
+
+def record_refresh_outcome(
+    thread_ids: List[int], succeeded: bool, db: TiDBHandler, volatility: float = None
+):
+    with db.connection.cursor() as cursor:
+        if succeeded:
+            cursor.executemany(
+                UPSERT_REFRESH_SUCCESS_QUERY,
+                [(thread_id, volatility) for thread_id in thread_ids],
+            )
+        else:
+            cursor.executemany(
+                UPSERT_REFRESH_FAILURE_QUERY.format(retry_delay=REFRESH_RETRY_DELAY),
+                [(thread_id,) for thread_id in thread_ids],
+            )
+    db.connection.commit()
@@ -0,0 +1,111 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from src.database.tidb_handler import TiDBHandler
+from src.database.settings import set_app_setting
+from src.database.counters import record_compacted_statistics
+from src.database.sql_queries import (
+    SCAN_THREAD_IDS_QUERY,
+    SELECT_COMPACTABLE_IDS_QUERY,
+    DELETE_ROWS_BY_IDS_QUERY,
+)
+from src.utils.serialization import dumps
+from src.config import (
+    RETENTION_DAYS,
+    RETENTION_DELETE_BATCH_SIZE,
+    RETENTION_BATCH_PAUSE,
+    logger,
+)
+
+RETENTION_REPORT = "statistics_retention_report"
+THREAD_BATCH_SIZE = 200
+
+
+def delete_rows(
+    table: str, ids: List[int], db: TiDBHandler, batch_size: int, pause: float
+) -> int:
+    """Deletes rows by id, committing every `batch_size` rows to keep transactions small."""
+    deleted = 0
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start : start + batch_size]
+        with db.connection.cursor() as cursor:
+            if table == "processed_data":
+                record_compacted_statistics(cursor, chunk)
+            cursor.execute(
+                DELETE_ROWS_BY_IDS_QUERY.format(
+                    table=table, ids=", ".join(["%s"] * len(chunk))
+                ),
+                chunk,
+            )
+            deleted += cursor.rowcount
+        db.connection.commit()
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def compact_table(
+    table: str,
+    retention_days: int,
+    db: TiDBHandler,
+    batch_size: int = RETENTION_DELETE_BATCH_SIZE,
+    pause: float = RETENTION_BATCH_PAUSE,
+) -> Dict:
+    """
+    Thins a table's rows older than `retention_days` to the newest row per thread and
+    ISO week; newer rows and each thread's latest row are always kept.
+
+    Threads are walked in id ranges, and the rows to drop are deleted in batches of
+    `batch_size`, each in its own transaction. Deleted processed_data rows still count
+    towards the dashboard statistics total (see record_compacted_statistics).
+    """
+    started = time.monotonic()
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    report = {"retention_days": retention_days, "deleted": 0, "batches": 0}
+
+    for threads in db.scan(SCAN_THREAD_IDS_QUERY, batch_size=THREAD_BATCH_SIZE):
+        low, high = threads[0][0], threads[-1][0]
+        with db.connection.cursor() as cursor:
+            cursor.execute(
+                SELECT_COMPACTABLE_IDS_QUERY.format(table=table),
+                (low, high, cutoff, low, high, cutoff),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            report["deleted"] += delete_rows(table, ids, db, batch_size, pause)
+            report["batches"] += math.ceil(len(ids) / batch_size)
+
+    report["duration_seconds"] = round(time.monotonic() - started, 1)
+    return report
+
+
+def compact_statistics_history(db: TiDBHandler) -> Dict[str, Dict]:
+    """
+    Applies the RETENTION_DAYS policy to raw_data and processed_data.
+
+    A failing table does not stop the others. The report (rows reclaimed per table)
+    is logged and kept in app_settings.
+
+    Returns:
+    - The report, keyed by table.
+    """
+    reports = {}
+    for table, retention_days in RETENTION_DAYS.items():
+        if retention_days <= 0:
+            continue
+        try:
+            reports[table] = compact_table(table, retention_days, db)
+        except Exception as e:
+            db.connection.rollback()
+            logger.error(f"[TIDB] Failed to compact {table}: {e}")
+            reports[table] = {"retention_days": retention_days, "error": str(e)}
+
+    logger.info(f"[TIDB] Statistics retention: {reports}")
+    set_app_setting(
+        RETENTION_REPORT,
+        dumps({"finished_at": datetime.now(), "tables": reports}),
+        db,
+    )
+    return reports
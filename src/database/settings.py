@@ -0,0 +1,15 @@
+from src.database.tidb_handler import TiDBHandler
+from src.database.sql_queries import SELECT_APP_SETTING_QUERY, UPSERT_APP_SETTING_QUERY
+
+
+def get_app_setting(name: str, db: TiDBHandler):
+    with db.connection.cursor() as cursor:
+        cursor.execute(SELECT_APP_SETTING_QUERY, (name,))
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_app_setting(name: str, value: str, db: TiDBHandler):
+    with db.connection.cursor() as cursor:
+        cursor.execute(UPSERT_APP_SETTING_QUERY, (name, value))
+    db.connection.commit()
@@ -13,8 +13,8 @@ SELECT_USER_BY_USERNAME_QUERY = """
 
 # Threads
 INSERT_THREAD_QUERY = """
-    INSERT INTO threads (user_id, name, query, country, query_embeddings, keywords, keywords_embeddings)
-    VALUES (%s, %s, %s, %s, %s, %s, %s);
+    INSERT INTO threads (user_id, name, query, country, query_embeddings, keywords, keywords_embeddings, category)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
 """
 
 SELECT_USER_THREADS_QUERY = """
@@ -71,6 +71,52 @@ DELETE_SNAPSHOT_STATISTICS_QUERY = """
 
 """
 
+## App settings
+SELECT_APP_SETTING_QUERY = """
+    SELECT value
+    FROM app_settings
+    WHERE name = %s;
+"""
+
+UPSERT_APP_SETTING_QUERY = """
+    INSERT INTO app_settings (name, value)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE value = VALUES(value);
+"""
+
+
+## Thread jobs
+INSERT_THREAD_JOB_QUERY = """
+    INSERT INTO thread_jobs (user_id, user_query, country, status, stage, progress)
+    VALUES (%s, %s, %s, 'queued', 'queued', 0);
+"""
+
+UPDATE_THREAD_JOB_QUERY = """
+    UPDATE thread_jobs
+    SET status = %s, stage = %s, progress = %s,
+        thread_id = COALESCE(%s, thread_id), error = %s
+    WHERE id = %s;
+"""
+
+FAIL_THREAD_JOB_QUERY = """
+    UPDATE thread_jobs
+    SET status = 'failed', stage = 'failed', progress = 100, thread_id = NULL, error = %s
+    WHERE id = %s;
+"""
+
+SELECT_THREAD_JOB_QUERY = """
+    SELECT id, user_id, status, stage, progress, thread_id, error, created_at, updated_at
+    FROM thread_jobs
+    WHERE id = %s;
+"""
+
+FAIL_INTERRUPTED_THREAD_JOBS_QUERY = """
+    UPDATE thread_jobs
+    SET status = 'failed', error = 'Interrupted by a server restart'
+    WHERE status IN ('queued', 'running');
+"""
+
+
 ###### Placeholder for Statics realted SQL Queries ########
 
 ## Raw Data
@@ -79,13 +125,10 @@ INSERT_RAW_DATA_QUERY = """
             thread_id,
             created_date, 
             queries, 
-            ComparedBreakdownByRegion, 
-            InterestByRegion, 
-            InterestOverTime, 
-            RelatedQueries, 
-            YouTubeSearch, 
-            ShoppingResults
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+            payload,
+            field_hashes,
+            content_hash
+        ) VALUES (%s, %s, %s, %s, %s, %s);
 """
 
 SELECT_RAW_DATA_QUERY = """
@@ -96,6 +139,37 @@ SELECT_RAW_DATA_QUERY = """
     LIMIT 1;
 """
 
+SELECT_LATEST_RAW_QUERIES_BY_IDS_QUERY = """
+    SELECT
+        t.id,
+        (
+            SELECT r.queries
+            FROM raw_data r
+            WHERE r.thread_id = t.id
+            ORDER BY r.created_date DESC, r.id DESC
+            LIMIT 1
+        ) AS queries
+    FROM threads t
+    WHERE t.id IN ({ids});
+"""
+
+# Queries of each thread's latest raw_data row, scanned by thread id
+SCAN_LATEST_RAW_QUERIES_QUERY = """
+    SELECT
+        t.id,
+        (
+            SELECT r.queries
+            FROM raw_data r
+            WHERE r.thread_id = t.id
+            ORDER BY r.created_date DESC, r.id DESC
+            LIMIT 1
+        ) AS queries
+    FROM threads t
+    WHERE t.id > %s
+    ORDER BY t.id
+    LIMIT %s;
+"""
+
 ## Processed Data
 INSERT_PROCESSED_DATA_QUERY = """
     INSERT INTO processed_data (
@@ -107,9 +181,20 @@ INSERT_PROCESSED_DATA_QUERY = """
         InterestOverTime, 
         RelatedQueries, 
         YouTubeSearch, 
-        ShoppingResults) 
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+        ShoppingResults,
+        content_hash) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+"""
+
+# Content hash of each thread's latest row in {table}, for {ids} placeholders
+SELECT_LATEST_CONTENT_HASHES_QUERY = """
+    SELECT thread_id, content_hash
+    FROM {table}
+    WHERE id IN (
+        SELECT MAX(id) FROM {table} WHERE thread_id IN ({ids}) GROUP BY thread_id
+    );
 """
+
 ## Get the latest processed data (current)
 SELECT_PROCESSED_DATA_QUERY = """
     SELECT 
@@ -235,28 +320,123 @@ COUNT_ALL_STATISTICS_QUERY = """
         processed_data;
 """
 
-INSERT_ALL_DASHBOARD_QUERY = """
-    INSERT INTO dashboard 
-    (total_thread_number, 
-    total_user_number, 
-    total_strategy_number, 
-    total_statistic_number)
-    VALUES (%s, %s, %s, %s);
+COUNT_THREAD_STRATEGIES_QUERY = """
+    SELECT COUNT(snapshot_id)
+    FROM strategy_snapshots
+    WHERE thread_id = %s;
 """
 
-GET_PREVIOUS_DASHBOARD_QUERY = """
-    SELECT 
+COUNT_SNAPSHOT_STRATEGIES_QUERY = """
+    SELECT COUNT(snapshot_id)
+    FROM strategy_snapshots
+    WHERE snapshot_id = %s;
+"""
+
+# Same per-field rule as COUNT_ALL_STATISTICS_QUERY, scoped to one thread / one row
+COUNT_THREAD_STATISTICS_QUERY = """
+    SELECT
+        COALESCE(SUM(CASE WHEN ComparedBreakdownByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestOverTime != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN RelatedQueries != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN YouTubeSearch != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN ShoppingResults != 'null' THEN 1 ELSE 0 END), 0)
+    FROM
+        processed_data
+    WHERE thread_id = %s;
+"""
+
+COUNT_PROCESSED_ROW_STATISTICS_QUERY = """
+    SELECT
+        COALESCE(SUM(CASE WHEN ComparedBreakdownByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestOverTime != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN RelatedQueries != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN YouTubeSearch != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN ShoppingResults != 'null' THEN 1 ELSE 0 END), 0)
+    FROM
+        processed_data
+    WHERE id = %s;
+"""
+
+## Dashboard counters
+SELECT_DASHBOARD_COUNTERS_QUERY = """
+    SELECT
+        total_thread_number,
+        total_user_number,
+        total_strategy_number,
+        total_statistic_number,
+        previous_thread_number,
+        previous_user_number,
+        previous_strategy_number,
+        previous_statistic_number
+    FROM dashboard_counters
+    WHERE id = 1;
+"""
+
+ADJUST_DASHBOARD_COUNTERS_QUERY = """
+    UPDATE dashboard_counters
+    SET
+        total_thread_number = total_thread_number + %s,
+        total_user_number = total_user_number + %s,
+        total_strategy_number = total_strategy_number + %s,
+        total_statistic_number = total_statistic_number + %s
+    WHERE id = 1;
+"""
+
+UPSERT_DASHBOARD_COUNTERS_QUERY = """
+    INSERT INTO dashboard_counters
+    (id,
+    total_thread_number,
+    total_user_number,
+    total_strategy_number,
+    total_statistic_number)
+    VALUES (1, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_thread_number = VALUES(total_thread_number),
+        total_user_number = VALUES(total_user_number),
+        total_strategy_number = VALUES(total_strategy_number),
+        total_statistic_number = VALUES(total_statistic_number);
+"""
+
+INSERT_DASHBOARD_HISTORY_QUERY = """
+    INSERT INTO dashboard
+    (total_thread_number,
+    total_user_number,
+    total_strategy_number,
+    total_statistic_number)
+    SELECT
         total_thread_number,
         total_user_number,
         total_strategy_number,
         total_statistic_number
-    FROM 
-        dashboard
-    WHERE 
-        DATE(created_at) = CURDATE() - INTERVAL 1 DAY
-    ORDER BY 
-        created_at ASC
-    LIMIT 1;
+    FROM dashboard_counters
+    WHERE id = 1;
+"""
+
+# processed_data rows deleted by retention keep counting towards total_statistic_number
+SELECT_COMPACTED_STATISTICS_QUERY = """
+    SELECT compacted_statistic_number
+    FROM dashboard_counters
+    WHERE id = 1;
+"""
+
+ADD_COMPACTED_STATISTICS_QUERY = """
+    INSERT INTO dashboard_counters (id, compacted_statistic_number)
+    VALUES (1, %s)
+    ON DUPLICATE KEY UPDATE
+        compacted_statistic_number = compacted_statistic_number + VALUES(compacted_statistic_number);
+"""
+
+ROLLUP_DASHBOARD_COUNTERS_QUERY = """
+    UPDATE dashboard_counters
+    SET
+        previous_thread_number = total_thread_number,
+        previous_user_number = total_user_number,
+        previous_strategy_number = total_strategy_number,
+        previous_statistic_number = total_statistic_number,
+        rolled_up_at = CURRENT_TIMESTAMP
+    WHERE id = 1;
 """
 
 SELECT_COUNTRY_QUERY = """
@@ -273,25 +453,43 @@ SELECT_QUERIES_TIMELINE_QUERY = """
     ORDER BY creation_date;
 """
 
-SELECT_ALL_QUERY = """
-    SELECT id, query, query_embeddings 
-    FROM threads;
+# Keyset scans: the key comes first, then `key > %s ... LIMIT %s` (see TiDBHandler.scan)
+SCAN_THREAD_EMBEDDINGS_QUERY = """
+    SELECT id, query, query_embeddings
+    FROM threads
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s;
+"""
+SELECT_UNCATEGORIZED_QUERY = """
+    SELECT id, query, query_embeddings
+    FROM threads
+    WHERE category IS NULL AND query_embeddings IS NOT NULL;
 """
-GET_CATEGORY_EMBEDDINGS_QUERY = """
-    SELECT document, embedding
-    FROM category_embeddings;
+SELECT_UNPROJECTED_QUERY = """
+    SELECT t.id, t.query, t.query_embeddings
+    FROM threads t
+    LEFT JOIN query_projections p ON p.thread_id = t.id
+    WHERE p.thread_id IS NULL AND t.query_embeddings IS NOT NULL;
 """
-MATCH_QUERY_TO_CATEGORY_QUERY = """
-    SELECT document
+COUNT_EMBEDDED_THREADS_QUERY = """
+    SELECT COUNT(id)
+    FROM threads
+    WHERE query_embeddings IS NOT NULL;
+"""
+SCAN_CATEGORY_EMBEDDINGS_QUERY = """
+    SELECT id, document, embedding
     FROM category_embeddings
-    ORDER BY VEC_COSINE_DISTANCE(embedding, %s) ASC
-    LIMIT 1;
-    """
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s;
+"""
 
+# Filled in with one "WHEN %s THEN %s" per thread and one %s per id
 UPDATE_QUERY_CATEGORIES_QUERY = """
-    UPDATE threads 
-    SET category = %s 
-    WHERE id = %s;
+    UPDATE threads
+    SET category = CASE id {cases} END
+    WHERE id IN ({ids});
 """
 
 GET_TOP_CATEGORIES_QUERY = """
@@ -301,3 +499,205 @@ GET_TOP_CATEGORIES_QUERY = """
     ORDER BY total_queries DESC
     LIMIT 10;
 """
+
+
+## Query embedding projections
+SELECT_PROJECTION_MODEL_QUERY = """
+    SELECT version, n_samples, mean, components, centroids
+    FROM projection_models
+    WHERE version = %s;
+"""
+
+INSERT_PROJECTION_MODEL_QUERY = """
+    INSERT INTO projection_models (version, n_samples, mean, components, centroids)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE n_samples = VALUES(n_samples);
+"""
+
+DELETE_OTHER_PROJECTION_MODELS_QUERY = """
+    DELETE FROM projection_models
+    WHERE version != %s;
+"""
+
+UPSERT_QUERY_PROJECTION_QUERY = """
+    INSERT INTO query_projections (thread_id, x, y, cluster_id, model_version)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        x = VALUES(x),
+        y = VALUES(y),
+        cluster_id = VALUES(cluster_id),
+        model_version = VALUES(model_version);
+"""
+
+SELECT_QUERY_PROJECTIONS_PAGE_QUERY = """
+    SELECT p.thread_id, p.x, p.y, p.cluster_id, t.category
+    FROM query_projections p
+    JOIN threads t ON t.id = p.thread_id
+    WHERE p.thread_id > %s
+    ORDER BY p.thread_id
+    LIMIT %s;
+"""
+
+
+## Scheduled refresh runs
+INSERT_REFRESH_RUN_QUERY = """
+    INSERT INTO refresh_runs (status, total, items_hash)
+    VALUES ('running', %s, %s);
+"""
+
+SELECT_INTERRUPTED_REFRESH_RUN_QUERY = """
+    SELECT id, items_hash
+    FROM refresh_runs
+    WHERE status = 'running'
+    ORDER BY id DESC
+    LIMIT 1;
+"""
+
+SELECT_SUCCEEDED_CHECKPOINTS_QUERY = """
+    SELECT thread_id
+    FROM refresh_checkpoints
+    WHERE run_id = %s AND status = 'succeeded';
+"""
+
+UPSERT_REFRESH_CHECKPOINT_QUERY = """
+    INSERT INTO refresh_checkpoints (run_id, thread_id, status, attempts, error)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        status = VALUES(status),
+        attempts = VALUES(attempts),
+        error = VALUES(error);
+"""
+
+ABORT_REFRESH_RUN_QUERY = """
+    UPDATE refresh_runs
+    SET status = 'aborted', finished_at = CURRENT_TIMESTAMP
+    WHERE id = %s;
+"""
+
+FINISH_REFRESH_RUN_QUERY = """
+    UPDATE refresh_runs
+    SET status = %s, total = %s, succeeded = %s, failed = %s, skipped = %s,
+        finished_at = CURRENT_TIMESTAMP
+    WHERE id = %s;
+"""
+
+
+## Priority refresh scheduling
+# Views are flushed in batches and timestamped with the database clock, like every other
+# scheduling time. A view makes the thread due within the hottest tier's interval
+# ({hot_interval} seconds)
+UPSERT_THREAD_ACCESS_QUERY = """
+    INSERT INTO thread_refresh_state (thread_id, access_count, last_accessed_at, next_refresh_at)
+    VALUES (%s, %s, NOW(), NOW())
+    ON DUPLICATE KEY UPDATE
+        access_count = access_count + VALUES(access_count),
+        last_accessed_at = VALUES(last_accessed_at),
+        next_refresh_at = LEAST(
+            COALESCE(next_refresh_at, '9999-12-31'),
+            GREATEST(NOW(), COALESCE(last_refreshed_at + INTERVAL {hot_interval} SECOND, NOW()))
+        );
+"""
+
+SELECT_DUE_THREADS_QUERY = """
+    SELECT
+        NOW() AS now,
+        t.id,
+        t.created_at,
+        s.last_accessed_at,
+        s.volatility,
+        COALESCE(
+            s.last_refreshed_at,
+            (SELECT MAX(r.created_date) FROM raw_data r WHERE r.thread_id = t.id)
+        ) AS last_refreshed_at
+    FROM threads t
+    LEFT JOIN thread_refresh_state s ON s.thread_id = t.id
+    WHERE s.thread_id IS NULL OR s.next_refresh_at <= NOW();
+"""
+
+UPSERT_THREAD_SCHEDULE_QUERY = """
+    INSERT INTO thread_refresh_state (thread_id, last_refreshed_at, next_refresh_at)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        last_refreshed_at = COALESCE(last_refreshed_at, VALUES(last_refreshed_at)),
+        next_refresh_at = VALUES(next_refresh_at);
+"""
+
+# Refreshed threads are due again right away so the next tick schedules them from their new state
+UPSERT_REFRESH_SUCCESS_QUERY = """
+    INSERT INTO thread_refresh_state (thread_id, volatility, last_refreshed_at, next_refresh_at)
+    VALUES (%s, %s, NOW(), NOW())
+    ON DUPLICATE KEY UPDATE
+        volatility = COALESCE(VALUES(volatility), volatility),
+        last_refreshed_at = VALUES(last_refreshed_at),
+        next_refresh_at = VALUES(next_refresh_at);
+"""
+
+UPSERT_REFRESH_FAILURE_QUERY = """
+    INSERT INTO thread_refresh_state (thread_id, next_refresh_at)
+    VALUES (%s, NOW() + INTERVAL {retry_delay} SECOND)
+    ON DUPLICATE KEY UPDATE
+        next_refresh_at = VALUES(next_refresh_at);
+"""
+
+
+## Interest Over Time history
+# Refreshes overlap the previous window, so existing points are overwritten in place
+UPSERT_INTEREST_POINTS_QUERY = """
+    INSERT INTO interest_points (thread_id, keyword, ts, value)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE value = VALUES(value);
+"""
+
+# {keywords} is empty or an "AND keyword IN (...)" filter
+SELECT_INTEREST_POINTS_QUERY = """
+    SELECT keyword, ts, value
+    FROM interest_points
+    WHERE thread_id = %s AND ts >= %s AND ts <= %s {keywords}
+    ORDER BY keyword, ts;
+"""
+
+
+## Retention
+SCAN_THREAD_IDS_QUERY = """
+    SELECT id
+    FROM threads
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s;
+"""
+
+# Rows of threads low..high older than the cutoff, except the newest row of each
+# thread and ISO week. A thread's latest row is always the newest of its week, so it
+# is never selected. Served by the (thread_id, created_date) index
+SELECT_COMPACTABLE_IDS_QUERY = """
+    SELECT id
+    FROM {table}
+    WHERE thread_id BETWEEN %s AND %s
+        AND created_date < %s
+        AND id NOT IN (
+            SELECT MAX(id)
+            FROM {table}
+            WHERE thread_id BETWEEN %s AND %s AND created_date < %s
+            GROUP BY thread_id, YEARWEEK(created_date, 3)
+        );
+"""
+
+# Same per-field rule as COUNT_ALL_STATISTICS_QUERY, for the processed_data rows
+# about to be compacted
+COUNT_ROWS_STATISTICS_QUERY = """
+    SELECT
+        COALESCE(SUM(CASE WHEN ComparedBreakdownByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestByRegion != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN InterestOverTime != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN RelatedQueries != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN YouTubeSearch != 'null' THEN 1 ELSE 0 END) +
+        SUM(CASE WHEN ShoppingResults != 'null' THEN 1 ELSE 0 END), 0)
+    FROM
+        processed_data
+    WHERE id IN ({ids});
+"""
+
+DELETE_ROWS_BY_IDS_QUERY = """
+    DELETE FROM {table}
+    WHERE id IN ({ids});
+"""
@@ -1,7 +1,6 @@
 from fastapi import HTTPException
 from typing import List, Dict
 from src.database.tidb_handler import TiDBHandler
-import json
 from datetime import datetime
 import pandas as pd
 from src.database.sql_queries import (
@@ -11,72 +10,133 @@ from src.database.sql_queries import (
     SELECT_RAW_DATA_QUERY,
     SELECT_PROCESSED_DATA_QUERY,
     SELECT_SNAPSHOT_DATA_QUERY,
+    COUNT_PROCESSED_ROW_STATISTICS_QUERY,
+    SELECT_LATEST_CONTENT_HASHES_QUERY,
 )
+from src.database.counters import adjust_dashboard_counters
+from src.database.interest_points import upsert_interest_points
+from src.utils.data_generator.trend_data import TREND_DATA_FIELDS, TrendData
+from src.utils.serialization import dumps, hash_bytes, loads
 import numpy as np
 from src.config import logger
 
 
-def insert_raw_data(thread_id: int, queries: Dict, data: Dict, db: TiDBHandler):
+def insert_raw_data(thread_id: int, trend_data: TrendData, db: TiDBHandler):
     """
     Inserts raw data into the specified table, with each data type in a separate column.
 
     Parameters:
     - thread_id: The ID associated with the thread (input variable).
-    - queries: A dictionary of the queries used to generate the data.
-    - data: A dictionary containing the retrieved data for each data type.
+    - trend_data: The queries used to generate the data and the data for each data type.
+    """
+    insert_raw_data_many([thread_id], trend_data, db)
+
+
+def insert_raw_data_many(
+    thread_ids: List[int], trend_data: TrendData, db: TiDBHandler
+) -> List[int]:
     """
+    Inserts the same raw data for several threads with one batched statement,
+    and merges its InterestOverTime into the threads' interest_points history.
+
+    The sources are stored compressed in one payload column. Threads whose latest row
+    already holds identical data get no new row.
+
+    Parameters:
+    - thread_ids: The IDs of the threads sharing this data.
+    - trend_data: The queries used to generate the data and the data for each data type.
+
+    Returns:
+    - The IDs of the threads a row was inserted for.
+    """
+    payload, field_hashes, content_hash = trend_data.encode()
     with db.connection.cursor() as cursor:
-        created_date = datetime.now()
-        queries = json.dumps(queries)
-        compared_breakdown_by_region = json.dumps(
-            data.get("ComparedBreakdownByRegion", None)
-        )
-        interest_by_region = json.dumps(data.get("InterestByRegion", None))
-        interest_over_time = json.dumps(data.get("InterestOverTime", None))
-        related_queries = json.dumps(data.get("RelatedQueries", None))
-        youtube_search = json.dumps(data.get("YouTubeSearch", None))
-        shopping_results = json.dumps(data.get("ShoppingResults", None))
-
-        cursor.execute(
-            INSERT_RAW_DATA_QUERY,
-            (
-                thread_id,
-                created_date,
-                queries,
-                compared_breakdown_by_region,
-                interest_by_region,
-                interest_over_time,
-                related_queries,
-                youtube_search,
-                shopping_results,
-            ),
-        )
+        changed = filter_changed_threads(cursor, "raw_data", thread_ids, content_hash)
+        if changed:
+            created_date = datetime.now()
+            queries, field_hashes = dumps(trend_data.queries), dumps(field_hashes)
+            cursor.executemany(
+                INSERT_RAW_DATA_QUERY,
+                [
+                    (
+                        thread_id,
+                        created_date,
+                        queries,
+                        payload,
+                        field_hashes,
+                        content_hash,
+                    )
+                    for thread_id in changed
+                ],
+            )
+            upsert_interest_points(cursor, changed, trend_data.get("InterestOverTime"))
         db.connection.commit()
 
+    return changed
+
+
+def insert_processed_data(thread_id: int, queries: Dict, data: Dict, db: TiDBHandler):
+    insert_processed_data_many([thread_id], queries, data, db)
 
-def insert_processed_data(thread_id: int, data: dict, db: TiDBHandler):
+
+def insert_processed_data_many(
+    thread_ids: List[int], queries: Dict, data: Dict, db: TiDBHandler
+) -> List[int]:
+    """
+    Inserts the same processed data for several threads, skipping threads whose latest
+    row already holds identical data. Returns the IDs of the threads a row was inserted for.
+    """
     logger.info(
-        f"[TIDB] Insert processed data into TIDB table with thread id: {thread_id}"
+        f"[TIDB] Insert processed data into TIDB table with thread ids: {thread_ids}"
     )
+    row = [dumps(queries)] + [dumps(data.get(key)) for key in TREND_DATA_FIELDS]
+    # orjson escapes newlines inside strings, so they can separate the fields
+    content_hash = hash_bytes("\n".join(row).encode())
     with db.connection.cursor() as cursor:
-        created_date = datetime.now().isoformat()
-
-        cursor.execute(
-            INSERT_PROCESSED_DATA_QUERY,
-            (
-                thread_id,
-                created_date,
-                data.get("queries"),
-                data.get("ComparedBreakdownByRegion"),
-                data.get("InterestByRegion"),
-                data.get("InterestOverTime"),
-                data.get("RelatedQueries"),
-                data.get("YouTubeSearch"),
-                data.get("ShoppingResults"),
-            ),
+        changed = filter_changed_threads(
+            cursor, "processed_data", thread_ids, content_hash
         )
+        if changed:
+            created_date = datetime.now().isoformat()
+            cursor.executemany(
+                INSERT_PROCESSED_DATA_QUERY,
+                [
+                    (thread_id, created_date, *row, content_hash)
+                    for thread_id in changed
+                ],
+            )
+            # Count one new row with the same rule as the dashboard's full count;
+            # the rows are identical, so it stands for all of them
+            cursor.execute(COUNT_PROCESSED_ROW_STATISTICS_QUERY, (cursor.lastrowid,))
+            adjust_dashboard_counters(
+                cursor, statistics=int(cursor.fetchone()[0]) * len(changed)
+            )
         db.connection.commit()
 
+    return changed
+
+
+def filter_changed_threads(
+    cursor, table: str, thread_ids: List[int], content_hash: str
+) -> List[int]:
+    """The threads whose latest row in `table` does not already have this content hash."""
+    if not thread_ids:
+        return []
+    cursor.execute(
+        SELECT_LATEST_CONTENT_HASHES_QUERY.format(
+            table=table, ids=", ".join(["%s"] * len(thread_ids))
+        ),
+        thread_ids,
+    )
+    unchanged = {
+        thread_id for thread_id, latest in cursor.fetchall() if latest == content_hash
+    }
+    if unchanged:
+        logger.info(
+            f"[TIDB] {table} unchanged for thread ids {sorted(unchanged)}, not stored"
+        )
+    return [thread_id for thread_id in thread_ids if thread_id not in unchanged]
+
 
 def insert_snapshot_data(thread_id: int, snapshot_id: int, data: Dict, db: TiDBHandler):
     logger.info(
@@ -93,14 +153,14 @@ def insert_snapshot_data(thread_id: int, snapshot_id: int, data: Dict, db: TiDBH
     """
     with db.connection.cursor() as cursor:
         created_date = datetime.now().isoformat()
-        compared_breakdown_by_region = json.dumps(
+        compared_breakdown_by_region = dumps(
             data.get("ComparedBreakdownByRegion", None)
         )
-        interest_by_region = json.dumps(data.get("InterestByRegion", None))
-        interest_over_time = json.dumps(data.get("InterestOverTime", None))
-        related_queries = json.dumps(data.get("RelatedQueries", None))
-        youtube_search = json.dumps(data.get("YouTubeSearch", None))
-        shopping_results = json.dumps(data.get("ShoppingResults", None))
+        interest_by_region = dumps(data.get("InterestByRegion", None))
+        interest_over_time = dumps(data.get("InterestOverTime", None))
+        related_queries = dumps(data.get("RelatedQueries", None))
+        youtube_search = dumps(data.get("YouTubeSearch", None))
+        shopping_results = dumps(data.get("ShoppingResults", None))
         # Prepare the query parameters, ensuring all data is JSON-serialized
         query_params = (
             thread_id,
@@ -118,24 +178,13 @@ def insert_snapshot_data(thread_id: int, snapshot_id: int, data: Dict, db: TiDBH
         db.connection.commit()
 
 
-def get_raw_data(thread_id: int, db: TiDBHandler):
+def get_raw_data(thread_id: int, db: TiDBHandler) -> TrendData:
     logger.info(
         f"[TIDB] Retrieve raw data from TIDB table with thread id : {thread_id}"
     )
     result_df = db.execute_query_as_dict(SELECT_RAW_DATA_QUERY, (thread_id,))
     raw_data_metadata = result_df[0]
-    queries = raw_data_metadata.get("queries", None)
-    raw_data = {
-        "ComparedBreakdownByRegion": raw_data_metadata.get(
-            "ComparedBreakdownByRegion", None
-        ),
-        "InterestByRegion": raw_data_metadata.get("InterestByRegion", None),
-        "InterestOverTime": raw_data_metadata.get("InterestOverTime", None),
-        "RelatedQueries": raw_data_metadata.get("RelatedQueries", None),
-        "YouTubeSearch": raw_data_metadata.get("YouTubeSearch", None),
-        "ShoppingResults": raw_data_metadata.get("ShoppingResults", None),
-    }
-    return raw_data, queries
+    return TrendData.from_row(raw_data_metadata)
 
 
 def get_processed_data(thread_id: int, db: TiDBHandler):
@@ -234,6 +283,6 @@ def safe_json_load(value):
     - A dictionary parsed from the JSON string, or an empty dictionary if parsing fails.
     """
     try:
-        return json.loads(value) if value else {}
-    except json.JSONDecodeError:
+        return loads(value) if value else {}
+    except ValueError:
         return {}
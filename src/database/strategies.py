@@ -1,6 +1,5 @@
 from fastapi import HTTPException
 from typing import List, Dict
-import json
 import pandas as pd
 
 from src.database.tidb_handler import TiDBHandler
@@ -11,6 +10,9 @@ from src.database.sql_queries import (
     COLOR_VECTOR_SEARCH_QUERY,
     SLOGAN_VECTOR_SEARCH_QUERY,
 )
+from src.database.vectors import encode_vector
+from src.database.counters import adjust_dashboard_counters
+from src.utils.serialization import dumps, loads
 from src.utils.openai.embeddings.generate_embeddings import get_embeddings
 from src.config import logger
 
@@ -22,14 +24,14 @@ def add_strategies(thread_id: int, snapshot_id: int, strategies: Dict, db: TiDBH
     try:
         # Extract the fields from the strategies dictionary
         target_audience = strategies["target_audience"]
-        marketing_strategies = json.dumps(strategies["marketing_strategies"])
+        marketing_strategies = dumps(strategies["marketing_strategies"])
         trend_summary = strategies["trend_summary"]
         brand_name = strategies["brand_name"]
         brand_description = strategies["brand_description"]
         brand_slogan = strategies["brand_slogan"]
-        brand_color_palette = json.dumps(strategies["brand_color_palette"])
-        logo_image = json.dumps(strategies["logo_image"])  # This is binary data
-        brand_logo = json.dumps(strategies["brand_logo"])
+        brand_color_palette = dumps(strategies["brand_color_palette"])
+        logo_image = dumps(strategies["logo_image"])  # This is binary data
+        brand_logo = dumps(strategies["brand_logo"])
 
         # Execute the query with parameterized inputs
         with db.connection.cursor() as cursor:
@@ -49,6 +51,7 @@ def add_strategies(thread_id: int, snapshot_id: int, strategies: Dict, db: TiDBH
                     brand_logo,
                 ),
             )
+            adjust_dashboard_counters(cursor, strategies=1)
             db.connection.commit()
 
     except Exception as e:
@@ -88,7 +91,7 @@ def vector_search_brand(brand_metadata: Dict, db: TiDBHandler) -> Dict:
 
     try:
         results = {}
-        description_embeddings = json.dumps(description_embeddings)
+        description_embeddings = encode_vector(description_embeddings)
         for key, query_template in queries.items():
             # Execute the query with parameterized embeddings
             result_list = db.execute_query_as_dict(
@@ -101,13 +104,11 @@ def vector_search_brand(brand_metadata: Dict, db: TiDBHandler) -> Dict:
 
             if key == "logos":
                 # Parse the JSON strings into dictionaries before accessing the "image" key
-                results[key] = [
-                    json.loads(item["meta"])["image"] for item in result_list
-                ]
+                results[key] = [loads(item["meta"])["image"] for item in result_list]
 
             elif key == "colors":
                 # Parse the JSON strings in "meta" column into dictionaries
-                color_metadata_list = [json.loads(item["meta"]) for item in result_list]
+                color_metadata_list = [loads(item["meta"]) for item in result_list]
 
                 # Normalize the list of dictionaries into a DataFrame
                 color_metadata_df = pd.json_normalize(color_metadata_list)
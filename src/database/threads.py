@@ -13,8 +13,14 @@ from src.database.sql_queries import (
     SELECT_SNAPSHOT_QUERY,
     DELETE_SNAPSHOT_STRATEGIES_QUERY,
     DELETE_SNAPSHOT_STATISTICS_QUERY,
+    COUNT_THREAD_STRATEGIES_QUERY,
+    COUNT_SNAPSHOT_STRATEGIES_QUERY,
+    COUNT_THREAD_STATISTICS_QUERY,
 )
-import json
+from src.database.counters import adjust_dashboard_counters
+from src.database.vectors import encode_vector
+from src.database.categories import classify_queries
+from src.utils.serialization import dumps
 import datetime
 
 from src.config import logger  # Import the logger
@@ -32,9 +38,16 @@ def create_thread(
 ):
     logger.info(f"[TIDB] Create thread with user and keyword information: {user_id}")
     try:
-        query_embeddings = json.dumps(query_embeddings)
-        keywords = json.dumps(keywords)
-        keywords_embeddings = json.dumps(keywords_embeddings)
+        # Categorize at write time; the background sweeper picks up any thread left NULL
+        try:
+            category = classify_queries([query_embeddings], db)[0]
+        except Exception as e:
+            logger.warning(f"[TIDB] Could not categorize the new thread: {e}")
+            category = None
+
+        query_embeddings = encode_vector(query_embeddings)
+        keywords = dumps(keywords)
+        keywords_embeddings = encode_vector(keywords_embeddings)
         with db.connection.cursor() as cursor:
             cursor.execute(
                 INSERT_THREAD_QUERY,
@@ -46,10 +59,12 @@ def create_thread(
                     query_embeddings,
                     keywords,
                     keywords_embeddings,
+                    category,
                 ),
             )
-            db.connection.commit()
             thread_id = cursor.lastrowid
+            adjust_dashboard_counters(cursor, threads=1)
+            db.connection.commit()
             return thread_id
 
     except Exception as e:
@@ -111,10 +126,24 @@ def remove_thread_by_id(thread_id: int, db: TiDBHandler):
     logger.info(f"[TIDB] Remove thread with thread id: {thread_id}")
     try:
         with db.connection.cursor() as cursor:
+            # Strategies and processed data go with the thread (ON DELETE CASCADE)
+            cursor.execute(COUNT_THREAD_STRATEGIES_QUERY, (thread_id,))
+            strategies_number = cursor.fetchone()[0]
+            cursor.execute(COUNT_THREAD_STATISTICS_QUERY, (thread_id,))
+            statistics_number = cursor.fetchone()[0]
+
             cursor.execute(DELETE_THREAD_BY_ID_QUERY, (thread_id,))
+            removed = cursor.rowcount > 0
+            if removed:
+                adjust_dashboard_counters(
+                    cursor,
+                    threads=-1,
+                    strategies=-int(strategies_number),
+                    statistics=-int(statistics_number),
+                )
             db.connection.commit()
 
-            return cursor.rowcount > 0
+            return removed
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -193,10 +222,16 @@ def remove_snapshot(snapshot_id: int, db: TiDBHandler):
     )
     try:
         with db.connection.cursor() as cursor:
+            cursor.execute(COUNT_SNAPSHOT_STRATEGIES_QUERY, (snapshot_id,))
+            strategies_number = cursor.fetchone()[0]
+
             cursor.execute(DELETE_SNAPSHOT_QUERY, (snapshot_id,))
+            removed = cursor.rowcount > 0
+            if removed:
+                adjust_dashboard_counters(cursor, strategies=-int(strategies_number))
             db.connection.commit()
 
-            return cursor.rowcount > 0
+            return removed
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,207 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import pymysql
+
+from src.config import logger
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the pool timeout."""
+
+
+class TiDBConnectionPool:
+    def __init__(
+        self,
+        credential: Dict,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        timeout: float = 30.0,
+        recycle: float = 1800.0,
+        pre_ping: bool = True,
+    ):
+        """
+        Process-wide pool of pymysql connections to TiDB.
+
+        :param credential: TiDB credential dictionary (host, port, user, password, database, ssl_ca).
+        :param pool_size: Number of idle connections kept open between requests.
+        :param max_overflow: Extra connections allowed above pool_size under load; closed on checkin.
+        :param timeout: Seconds to wait for a free connection before raising PoolTimeoutError.
+        :param recycle: Maximum lifetime of a connection in seconds before it is reopened.
+        :param pre_ping: Ping idle connections on checkout and replace the dead ones.
+        """
+        self._credential = credential
+        self._pool_size = pool_size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._recycle = recycle
+        self._pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle: List[Tuple[pymysql.connections.Connection, float]] = []
+        self._checked_out: Dict[int, float] = {}
+        self._total = 0
+
+        # Counters exposed through stats()
+        self._opened = 0
+        self._closed = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._peak_checked_out = 0
+
+    def _connect(self) -> pymysql.connections.Connection:
+        connection = pymysql.connect(
+            host=self._credential["host"],
+            port=self._credential["port"],
+            user=self._credential["user"],
+            password=self._credential["password"],
+            database=self._credential["database"],
+            ssl_verify_cert=True,
+            ssl_verify_identity=True,
+            ssl_ca=self._credential["ssl_ca"],
+        )
+        with self._cond:
+            self._opened += 1
+        return connection
+
+    def _close(self, connection: pymysql.connections.Connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._closed += 1
+
+    def _is_usable(self, connection, created_at: float) -> bool:
+        if time.monotonic() - created_at > self._recycle:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if not connection.open:
+            with self._cond:
+                self._invalidated += 1
+            return False
+        if self._pre_ping:
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._invalidated += 1
+                return False
+        return True
+
+    def checkout(self) -> pymysql.connections.Connection:
+        """
+        Check a connection out of the pool, opening a new one if there is spare capacity.
+
+        Blocks up to `timeout` seconds when pool_size + max_overflow connections are in use.
+        """
+        deadline = time.monotonic() + self._timeout
+        connection, created_at = None, None
+
+        with self._cond:
+            waited = False
+            while True:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    break
+                if self._total < self._pool_size + self._max_overflow:
+                    # Reserve the slot now, open the connection outside the lock
+                    self._total += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    logger.warning(f"[TIDB] Connection pool exhausted: {self.stats()}")
+                    raise PoolTimeoutError(
+                        f"Timed out after {self._timeout}s waiting for a TiDB connection"
+                    )
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+        try:
+            if connection is not None and not self._is_usable(connection, created_at):
+                self._close(connection)
+                connection = None
+            if connection is None:
+                connection = self._connect()
+                created_at = time.monotonic()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._checked_out[id(connection)] = created_at
+            self._checkouts += 1
+            self._peak_checked_out = max(self._peak_checked_out, len(self._checked_out))
+        return connection
+
+    def checkin(self, connection: pymysql.connections.Connection):
+        """
+        Return a connection to the pool.
+
+        Any open transaction is rolled back so the next borrower starts from a clean state.
+        Overflow, expired and broken connections are closed instead of being kept idle.
+        """
+        with self._cond:
+            created_at = self._checked_out.pop(id(connection), None)
+        if created_at is None:
+            return
+
+        keep = connection.open
+        if keep:
+            try:
+                connection.rollback()
+            except Exception:
+                keep = False
+
+        with self._cond:
+            expired = time.monotonic() - created_at > self._recycle
+            if keep and not expired and len(self._idle) < self._pool_size:
+                self._idle.append((connection, created_at))
+                self._cond.notify()
+                return
+            self._total -= 1
+            self._cond.notify()
+
+        if expired:
+            with self._cond:
+                self._recycled += 1
+        self._close(connection)
+
+    def dispose(self):
+        """Close every idle connection. Checked-out connections are closed on checkin."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "pool_size": self._pool_size,
+                "max_overflow": self._max_overflow,
+                "total": self._total,
+                "idle": len(self._idle),
+                "checked_out": len(self._checked_out),
+                "overflow": max(self._total - self._pool_size, 0),
+                "peak_checked_out": self._peak_checked_out,
+                "checkouts": self._checkouts,
+                "opened": self._opened,
+                "closed": self._closed,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+            }
@@ -2,6 +2,7 @@ from fastapi import HTTPException
 
 from src.database.tidb_handler import TiDBHandler
 from src.database.sql_queries import INSERT_USER_QUERY, SELECT_USER_BY_USERNAME_QUERY
+from src.database.counters import adjust_dashboard_counters
 
 from src.config import logger  # Import the logger
 
@@ -13,8 +14,9 @@ def add_user(username: str, password: str, db: TiDBHandler):
     try:
         with db.connection.cursor() as cursor:
             cursor.execute(INSERT_USER_QUERY, (username, password))
-            db.connection.commit()
             user_id = cursor.lastrowid
+            adjust_dashboard_counters(cursor, users=1)
+            db.connection.commit()
             return {"id": user_id, "username": username}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
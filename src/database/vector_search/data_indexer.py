@@ -1,5 +1,5 @@
 from tidb_vector.integrations import TiDBVectorClient
-from src.utils.openai.embeddings.generate_embeddings import get_embeddings
+from src.utils.openai.embeddings.generate_embeddings import get_embeddings_batch
 import pandas as pd
 import json
 
@@ -17,7 +17,7 @@ def run_embedding_script(file_path: str, embedding_column: str, table_name: str)
 
     # Extract the 'text' column and generate embeddings
     texts = df[embedding_column].tolist()
-    embeddings = [get_embeddings(text) for text in texts]
+    embeddings = get_embeddings_batch(texts)
 
     # Save the list to a JSON file
     try:
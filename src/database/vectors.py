@@ -0,0 +1,32 @@
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+EMBEDDING_DIMENSION = 1536
+
+
+def encode_vector(vector: Iterable[float]) -> Optional[str]:
+    """
+    Encodes an embedding into TiDB's vector literal, e.g. "[0.1,0.2]".
+
+    Values are rounded to float32 precision, which is what a VECTOR column stores,
+    so the literal is about half the size of a json.dumps of the float64 list.
+    """
+    if vector is None:
+        return None
+    values = np.asarray(vector, dtype=np.float32)
+    return "[" + ",".join(map("{:.9g}".format, values.tolist())) + "]"
+
+
+def decode_vector(value: Union[str, bytes, None]) -> Optional[np.ndarray]:
+    """
+    Decodes a VECTOR column (or a legacy JSON array column) into a float32 array.
+
+    Parsing goes straight from the text to the array, skipping the Python float list
+    that json.loads would build.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("ascii")
+    return np.fromstring(value.strip()[1:-1], sep=",", dtype=np.float32)
@@ -1,23 +1,24 @@
 import pandas as pd
 import math
 from typing import Dict
-import json
+
+from src.utils.data_generator.trend_data import TrendData
 
 from src.config import logger  # Import the logger
 
 
 class StatProcessor:
-    def __init__(self, queries: dict, data: dict):
+    def __init__(self, trend_data: TrendData):
         """
         Initialize the StatProcessor class with the input data.
 
-        :param data: A dictionary containing the input data with keys:
+        :param trend_data: The raw SerpAPI results, with records for:
                      - ComparedBreakdownByRegion
                      - InterestByRegion
                      - InterestOverTime
         """
-        self.data = data
-        self.keywords = queries["q"].split(",")
+        self.data = trend_data.records
+        self.keywords = trend_data.keywords
         self.main_keyword = self.keywords[0]
 
     def process_data(self) -> dict:
@@ -44,7 +45,7 @@ class StatProcessor:
 
         :return: A dictionary containing the top seven locations and the world aggregated data.
         """
-        compared_data = json.loads(self.data["ComparedBreakdownByRegion"])
+        compared_data = self.data.get("ComparedBreakdownByRegion")
         if compared_data:
             # Sort the compared data by the main query percentage in descending order
             sorted_data = sorted(
@@ -73,7 +74,7 @@ class StatProcessor:
 
         :return: A dictionary containing the top 10 countries by total interest.
         """
-        interest_data = json.loads(self.data["InterestByRegion"])
+        interest_data = self.data.get("InterestByRegion")
         df_interest = pd.DataFrame(interest_data)
         if df_interest.empty:
             return None
@@ -94,7 +95,7 @@ class StatProcessor:
 
         :return: A dictionary containing the interest over time data.
         """
-        interest_time_data = json.loads(self.data["InterestOverTime"])
+        interest_time_data = self.data.get("InterestOverTime")
         df_time = pd.DataFrame(interest_time_data)
         if df_time.empty:
             return
@@ -131,7 +132,7 @@ class StatProcessor:
                 return False
             return True
 
-        youtube_data = json.loads(self.data["YouTubeSearch"])
+        youtube_data = self.data.get("YouTubeSearch")
         df = pd.DataFrame(youtube_data)
         if df.empty:
             return None
@@ -162,7 +163,7 @@ class StatProcessor:
 
         :return: A dictionary containing the top 10 rising related queries.
         """
-        related_queries = json.loads(self.data["RelatedQueries"])
+        related_queries = self.data.get("RelatedQueries")
         df_related = pd.DataFrame(related_queries)
         if df_related.empty:
             return None
@@ -188,7 +189,7 @@ class StatProcessor:
         all_products = []
         # Check if self.data is a list of multiple datasets
 
-        shopping_results = json.loads(self.data["ShoppingResults"])
+        shopping_results = self.data.get("ShoppingResults")
 
         if shopping_results != None or shopping_results == []:
             # Process each product in the shopping results
@@ -4,26 +4,28 @@ from src import config
 from src.database.tidb_handler import TiDBHandler
 from typing import Dict
 import pandas as pd
-import json
 from datetime import datetime
 from src.utils.data_generator.serp_api_call import get_all_data
 import src.config as config
 from typing import List, Dict
 from src.utils.data_generator.StatProcessor import StatProcessor
+from src.utils.data_generator.trend_data import TrendData
+from src.utils.serialization import loads
 from src.database.statistics import (
     insert_raw_data,
     insert_processed_data,
 )
-import numpy as np
 
 from src.config import logger  # Import the logger
 
 
-with open("src/utils/data_generator/country_codes.json", "r") as json_file:
-    COUNTRY_CODES = json.load(json_file)
+with open("src/utils/data_generator/country_codes.json", "rb") as json_file:
+    COUNTRY_CODES = loads(json_file.read())
 
 
-def update_raw_data(thread_id: int, keywords_list: List, country: str, db: TiDBHandler, update=False):
+def update_raw_data(
+    thread_id: int, keywords_list: List, country: str, db: TiDBHandler, update=False
+) -> TrendData:
     """
     Process data for a given thread ID and keywords, then insert it into the database.
     Parameters:
@@ -31,6 +33,24 @@ def update_raw_data(thread_id: int, keywords_list: List, country: str, db: TiDBH
     - keywords: list of kewords.
     - queries: A dictionary containing parameters for the data query.
     """
+    trend_data = fetch_trend_data(keywords_list, country, update)
+    # Insert the data into the table
+    insert_raw_data(thread_id, trend_data, db)
+
+    return trend_data
+
+
+def fetch_trend_data(keywords_list: List, country: str, update=False) -> TrendData:
+    """
+    Fetches the SerpAPI data for the keywords without storing it.
+
+    Parameters:
+    - keywords_list: list of keywords.
+    - country: country name, or the stored gl code when update is True.
+
+    Returns:
+    - The results as a TrendData, still in memory.
+    """
     keywords = ",".join(keywords_list)
 
     if update==True:
@@ -64,59 +84,20 @@ def update_raw_data(thread_id: int, keywords_list: List, country: str, db: TiDBH
         keywords, geo, region, tz, frequency, hl, gl, cat, device, sort_by
     )
 
-    data_serialized = {
-        key: (
-            df.replace({np.nan: None}).to_dict(orient="records")
-            if isinstance(df, pd.DataFrame)
-            else df
-        )
-        for key, df in data.items()
-    }
-    formatted_data = {}
-    # Serialize to JSON strings and handle potential issues
-    try:
-        formatted_data["queries"] = json.dumps(
-            queries, ensure_ascii=False, allow_nan=False
-        )
-        for key, value in data_serialized.items():
-            formatted_data[key] = json.dumps(value, ensure_ascii=False, allow_nan=False)
-
-    except (TypeError, ValueError) as e:
-        print("Error during JSON serialization:", e)
-        return
+    return TrendData.from_frames(queries, data)
 
-    # Insert the data into the table
-    insert_raw_data(thread_id, queries, formatted_data, db)
 
-    return queries, formatted_data
+def update_processed_data(thread_id, trend_data: TrendData, db: TiDBHandler):
+    processed_data = process_trend_data(trend_data)
+    insert_processed_data(thread_id, trend_data.queries, processed_data, db)
 
+    return processed_data
 
-def update_processed_data(thread_id, raw_queries, raw_data, db: TiDBHandler):
 
-    stat_processor = StatProcessor(raw_queries, raw_data)
+def process_trend_data(trend_data: TrendData) -> Dict:
+    """Runs the statistics processing on raw trend data without storing it."""
+    stat_processor = StatProcessor(trend_data)
     processed_data = stat_processor.process_data()
     print("processed_data ready")
 
-    processed_data_serialized = {
-        key: (
-            df.replace({np.nan: None}).to_dict(orient="records")
-            if isinstance(df, pd.DataFrame)
-            else df
-        )
-        for key, df in processed_data.items()
-    }
-    formatted_data = {}
-    # Serialize to JSON strings and handle potential issues
-    try:
-        formatted_data["queries"] = json.dumps(
-            raw_queries, ensure_ascii=False, allow_nan=False
-        )
-        for key, value in processed_data_serialized.items():
-            formatted_data[key] = json.dumps(value, ensure_ascii=False, allow_nan=False)
-
-    except (TypeError, ValueError) as e:
-        print("Error during JSON serialization:", e)
-        return
-    insert_processed_data(thread_id, formatted_data, db)
-
     return processed_data
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from src.config import SERPAPI_RATE_LIMIT, SERPAPI_RATE_BURST
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        """
+        Thread-safe token bucket: up to `capacity` calls at once, refilled at `rate` per second.
+
+        A rate of 0 or less disables limiting. `waited` is the wall-clock time, in
+        seconds, during which at least one caller was blocked; overlapping waits of
+        several threads count once.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waited = 0.0
+        self._waiting = 0
+        self._wait_started = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def waited(self) -> float:
+        with self._lock:
+            if self._waiting:
+                return self._waited + time.monotonic() - self._wait_started
+            return self._waited
+
+    def acquire(self, tokens: int = 1):
+        """Blocks until `tokens` tokens are available and takes them."""
+        if self.rate <= 0:
+            return
+        blocked = False
+        try:
+            while True:
+                with self._lock:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    if not blocked:
+                        blocked = True
+                        if not self._waiting:
+                            self._wait_started = time.monotonic()
+                        self._waiting += 1
+                    delay = (tokens - self._tokens) / self.rate
+                time.sleep(delay)
+        finally:
+            if blocked:
+                with self._lock:
+                    self._waiting -= 1
+                    if not self._waiting:
+                        self._waited += time.monotonic() - self._wait_started
+
+
+# Shared by every SerpAPI caller in the process
+serpapi_rate_limiter = TokenBucket(SERPAPI_RATE_LIMIT, SERPAPI_RATE_BURST)
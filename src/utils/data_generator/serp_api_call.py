@@ -1,4 +1,8 @@
-from src.config import SERPAPI_CREDENTIAL
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.config import SERPAPI_CREDENTIAL, SERPAPI_MAX_WORKERS, SERPAPI_CALL_TIMEOUT
 from src.utils.data_generator.data_filters import (
     filter_ComparedBreakdownByRegion,
     filter_InterestByRegion,
@@ -9,8 +13,15 @@ from src.utils.data_generator.data_filters import (
 )
 
 from serpapi import GoogleSearch
+from src.utils.data_generator.serp_cache import serp_cache
+from src.utils.data_generator.rate_limiter import serpapi_rate_limiter
 from src.config import logger  # Import the logger
 
+# Shared across requests so the total number of in-flight SerpAPI calls stays bounded
+_executor = ThreadPoolExecutor(
+    max_workers=SERPAPI_MAX_WORKERS, thread_name_prefix="serpapi"
+)
+
 
 def get_all_data(
     keywords,
@@ -25,7 +36,8 @@ def get_all_data(
     sort_by="relevance",
 ):
     """
-    Calls all API functions with the provided parameters and returns a dictionary with the results.
+    Calls all API functions concurrently with the provided parameters and returns a dictionary with the results.
+    A call that fails, or whose HTTP request takes longer than SERPAPI_CALL_TIMEOUT seconds, yields None for its key.
 
     Parameters:
     - keywords: A string of 5 comma-separated keywords.
@@ -58,28 +70,90 @@ def get_all_data(
     # Split the keywords into a list for APIs that don't accept multiple queries
     keyword_list = keywords.split(",")
 
-    data = {
-        "ComparedBreakdownByRegion": get_Trends_ComparedBreakdownByRegion(
-            keywords, geo, region
+    calls = {
+        "ComparedBreakdownByRegion": (
+            get_Trends_ComparedBreakdownByRegion,
+            (keywords, geo, region),
         ),
-        "InterestByRegion": get_Trends_InterestByRegion(
-            keyword_list[0], geo, region
+        "InterestByRegion": (
+            get_Trends_InterestByRegion,
+            (keyword_list[0], geo, region),
         ),  # search for the main keyword only
-        "InterestOverTime": get_Trends_InterestOverTime(keywords, geo),
-        "RelatedQueries": get_Trends_RelatedQueries(
-            keyword_list[0], tz
+        "InterestOverTime": (get_Trends_InterestOverTime, (keywords, geo)),
+        "RelatedQueries": (
+            get_Trends_RelatedQueries,
+            (keyword_list[0], tz),
         ),  # search for the main keyword only
-        "YouTubeSearch": get_YouTube_Search(
-            keyword_list[0], gl, hl
+        "YouTubeSearch": (
+            get_YouTube_Search,
+            (keyword_list[0], gl, hl),
         ),  # for the main keyword only
-        "ShoppingResults": get_ShoppingResults(
-            keyword_list[0], geo, hl, gl, device, sort_by
+        "ShoppingResults": (
+            get_ShoppingResults,
+            (keyword_list[0], geo, hl, gl, device, sort_by),
         ),  # search for the main keyword only
     }
+    data = fetch_concurrently(calls)
 
     return queries_used, data
 
 
+def fetch_concurrently(calls: dict) -> dict:
+    """
+    Runs the given API calls at the same time and collects their results.
+
+    Each call bounds its own HTTP requests (see cached_search), so time spent queued
+    for a worker or waiting on the rate limiter never counts against its timeout.
+
+    Parameters:
+    - calls: A dictionary mapping a result key to a (function, args) tuple.
+
+    Returns:
+    - A dictionary with the same keys, holding each call's result or None if it failed or timed out.
+    """
+    futures = {
+        key: _executor.submit(function, *args)
+        for key, (function, args) in calls.items()
+    }
+
+    data = {}
+    for key, future in futures.items():
+        try:
+            data[key] = future.result()
+        except requests.Timeout:
+            logger.warning(f"[SerpAPI] {key} timed out after {SERPAPI_CALL_TIMEOUT}s")
+            data[key] = None
+        except Exception as e:
+            logger.error(f"[SerpAPI] {key} failed: {e}")
+            data[key] = None
+    return data
+
+
+def cached_search(params: dict) -> dict:
+    """
+    Runs a SerpAPI search, serving repeated parameter sets from the response cache.
+
+    Parameters:
+    - params: The SerpAPI query parameters, including api_key (ignored for the cache key).
+
+    Returns:
+    - The raw SerpAPI response dictionary.
+    """
+    results = serp_cache.get(params)
+    if results is not None:
+        return results
+
+    serpapi_rate_limiter.acquire()
+    search = GoogleSearch(params)
+    # The timeout starts with the request itself, after the rate limiter let it through
+    search.timeout = SERPAPI_CALL_TIMEOUT
+    results = search.get_dict()
+    # Error responses (quota, invalid query) are not worth keeping
+    if isinstance(results, dict) and "error" not in results:
+        serp_cache.set(params, results)
+    return results
+
+
 # Google Trends API: Compared Breakdown By Region
 def get_Trends_ComparedBreakdownByRegion(q, geo="", region="COUNTRY", tz=420):
     """
@@ -102,8 +176,7 @@ def get_Trends_ComparedBreakdownByRegion(q, geo="", region="COUNTRY", tz=420):
         "api_key": SERPAPI_CREDENTIAL,
     }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_ComparedBreakdownByRegion(results)
     return None
@@ -141,8 +214,7 @@ def get_Trends_InterestByRegion(q, geo="", region="COUNTRY"):
             "api_key": SERPAPI_CREDENTIAL,
         }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_InterestByRegion(results)
     else:
@@ -153,8 +225,7 @@ def get_Trends_InterestByRegion(q, geo="", region="COUNTRY"):
             "data_type": "GEO_MAP_0",
             "api_key": SERPAPI_CREDENTIAL,
         }
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         if results != "[]":
             return filter_InterestByRegion(results)
         return None
@@ -182,8 +253,7 @@ def get_Trends_InterestOverTime(q, geo="", tz=420):
         "api_key": SERPAPI_CREDENTIAL,
     }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_InterestOverTime(results)
     return None
@@ -209,8 +279,7 @@ def get_Trends_RelatedQueries(q, tz=420):
         "api_key": SERPAPI_CREDENTIAL,
     }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_RelatedQueries(results)
     return None
@@ -244,8 +313,7 @@ def get_YouTube_Search(
         "api_key": SERPAPI_CREDENTIAL,
     }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_YouTubeSearch(results)
     return None
@@ -280,8 +348,7 @@ def get_ShoppingResults(
         "api_key": SERPAPI_CREDENTIAL,
     }
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    results = cached_search(params)
     if results != "[]":
         return filter_ShoppingResults(results)
     return None
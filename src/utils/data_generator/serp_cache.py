@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from src.config import (
+    SERPAPI_CACHE_PATH,
+    SERPAPI_CACHE_MAX_ENTRIES,
+    SERPAPI_CACHE_TTLS,
+    logger,
+)
+
+CREATE_SERP_CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS serp_cache (
+        key TEXT PRIMARY KEY,
+        engine TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_accessed REAL NOT NULL,
+        payload TEXT NOT NULL
+    );
+"""
+CREATE_SERP_CACHE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_serp_cache_last_accessed
+    ON serp_cache (last_accessed);
+"""
+
+CASE_INSENSITIVE_PARAMS = ("q", "gl", "hl")
+
+
+class SerpCache:
+    def __init__(self, path: str, max_entries: int, ttls: Dict[str, float]):
+        """
+        Persistent SQLite cache of SerpAPI responses.
+
+        :param path: Location of the SQLite database file.
+        :param max_entries: Number of responses kept before the least recently used ones are evicted.
+        :param ttls: Time to live in seconds per engine label (see `engine_label`), with a "default" entry.
+        """
+        self._path = path
+        self._max_entries = max_entries
+        self._ttls = ttls
+        self._lock = threading.Lock()
+        self._connection = None
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL;")
+            self._connection.execute(CREATE_SERP_CACHE_TABLE_SQL)
+            self._connection.execute(CREATE_SERP_CACHE_INDEX_SQL)
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def engine_label(params: Dict) -> str:
+        """Google Trends responses are told apart by data_type, e.g. "google_trends:TIMESERIES"."""
+        engine = params.get("engine", "")
+        if engine == "google_trends":
+            return f"{engine}:{params.get('data_type', '')}"
+        return engine
+
+    @staticmethod
+    def cache_key(params: Dict) -> str:
+        """
+        Only the query, country and language are case- and whitespace-insensitive;
+        other values such as `sp` filters are case-sensitive and kept as given.
+        """
+        canonical = {
+            key: (
+                str(value).strip().lower()
+                if key in CASE_INSENSITIVE_PARAMS
+                else str(value)
+            )
+            for key, value in params.items()
+            if key != "api_key" and value is not None
+        }
+        encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _ttl(self, engine: str) -> float:
+        return self._ttls.get(engine, self._ttls["default"])
+
+    def get(self, params: Dict) -> Optional[Dict]:
+        key = self.cache_key(params)
+        engine = self.engine_label(params)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT created_at, payload FROM serp_cache WHERE key = ?;", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            created_at, payload = row
+            if now - created_at > self._ttl(engine):
+                connection.execute("DELETE FROM serp_cache WHERE key = ?;", (key,))
+                connection.commit()
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            connection.execute(
+                "UPDATE serp_cache SET last_accessed = ? WHERE key = ?;", (now, key)
+            )
+            connection.commit()
+            self._counters["hits"] += 1
+
+        logger.info(f"[SerpAPI] Cache hit for {engine}: {self.stats()}")
+        return json.loads(payload)
+
+    def set(self, params: Dict, results: Dict):
+        key = self.cache_key(params)
+        engine = self.engine_label(params)
+        now = time.time()
+        payload = json.dumps(results, ensure_ascii=False)
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO serp_cache (key, engine, created_at, last_accessed, payload) "
+                "VALUES (?, ?, ?, ?, ?);",
+                (key, engine, now, now, payload),
+            )
+            self._counters["stores"] += 1
+
+            (count,) = connection.execute("SELECT COUNT(*) FROM serp_cache;").fetchone()
+            overflow = count - self._max_entries
+            if overflow > 0:
+                connection.execute(
+                    "DELETE FROM serp_cache WHERE key IN ("
+                    "SELECT key FROM serp_cache ORDER BY last_accessed ASC LIMIT ?);",
+                    (overflow,),
+                )
+                self._counters["evictions"] += overflow
+            connection.commit()
+
+    def stats(self) -> Dict:
+        counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+
+serp_cache = SerpCache(
+    SERPAPI_CACHE_PATH, SERPAPI_CACHE_MAX_ENTRIES, SERPAPI_CACHE_TTLS
+)
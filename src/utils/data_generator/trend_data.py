@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.serialization import (
+    compress,
+    decompress,
+    dumps_bytes,
+    hash_bytes,
+    load_json_column,
+    loads,
+)
+
+TREND_DATA_FIELDS = [
+    "ComparedBreakdownByRegion",
+    "InterestByRegion",
+    "InterestOverTime",
+    "RelatedQueries",
+    "YouTubeSearch",
+    "ShoppingResults",
+]
+
+
+@dataclass
+class TrendData:
+    """
+    SerpAPI results for one set of queries, held as plain records in memory.
+
+    Passed as-is from get_all_data to StatProcessor and serialized once, by encode(),
+    when it is written to raw_data.
+    """
+
+    queries: Dict
+    records: Dict[str, Optional[List[Dict]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_frames(cls, queries: Dict, frames: Dict) -> "TrendData":
+        """
+        Builds it from get_all_data's output, where each source is a DataFrame or None.
+
+        NaN becomes None, as it would after a JSON round trip.
+        """
+        return cls(
+            queries,
+            {
+                key: (
+                    frame.replace({np.nan: None}).to_dict(orient="records")
+                    if isinstance(frame, pd.DataFrame)
+                    else frame
+                )
+                for key, frame in frames.items()
+            },
+        )
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "TrendData":
+        """
+        Builds it from a raw_data row.
+
+        Rows hold the sources either in the compressed payload or, when written before
+        it existed, in one JSON column each.
+        """
+        queries = row.get("queries")
+        if isinstance(queries, (str, bytes)):
+            queries = load_json_column(queries)
+        if row.get("payload") is not None:
+            return cls(queries, loads(decompress(row["payload"])))
+        return cls(
+            queries, {key: load_json_column(row.get(key)) for key in TREND_DATA_FIELDS}
+        )
+
+    @property
+    def keywords(self) -> List[str]:
+        return self.queries["q"].split(",")
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        return self.records.get(key)
+
+    def has_data(self) -> bool:
+        """False when no SerpAPI source returned anything."""
+        return any(self.records.get(key) is not None for key in TREND_DATA_FIELDS)
+
+    def encode(self) -> Tuple[bytes, Dict[str, str], str]:
+        """
+        Serializes every source exactly once, for a raw_data row.
+
+        Returns:
+        - The sources as one zstd-compressed JSON object (raw_data.payload).
+        - The hash of the queries and of each source's JSON, keyed by name.
+        - A content hash over all of them, equal for identical data.
+        """
+        fields = {key: dumps_bytes(self.records.get(key)) for key in TREND_DATA_FIELDS}
+        document = b"{%s}" % b",".join(
+            b'"%s":%s' % (key.encode(), body) for key, body in fields.items()
+        )
+
+        field_hashes = {"queries": hash_bytes(dumps_bytes(self.queries))}
+        field_hashes.update({key: hash_bytes(body) for key, body in fields.items()})
+        content_hash = hash_bytes("".join(field_hashes.values()).encode())
+        return compress(document), field_hashes, content_hash
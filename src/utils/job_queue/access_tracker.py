@@ -0,0 +1,36 @@
+import threading
+from typing import Dict
+
+from src.database.init_tidb import tidb_session
+from src.database.refresh import record_thread_accesses
+from src.config import logger
+
+
+class ThreadAccessTracker:
+    def __init__(self):
+        """
+        Counts thread views in memory so read endpoints never write to the database.
+
+        Counts are written to thread_refresh_state in one batch by flush().
+        """
+        self._lock = threading.Lock()
+        self._counts: Dict[int, int] = {}
+
+    def record(self, thread_id: int):
+        with self._lock:
+            self._counts[thread_id] = self._counts.get(thread_id, 0) + 1
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return
+
+        try:
+            with tidb_session() as db:
+                record_thread_accesses(counts, db)
+        except Exception as e:
+            logger.error(f"[Jobs] Failed to flush {len(counts)} thread accesses: {e}")
+
+
+thread_access_tracker = ThreadAccessTracker()
@@ -0,0 +1,38 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from src.config import THREAD_JOB_WORKERS, logger
+
+
+class JobQueue:
+    def __init__(self, name: str, max_workers: int):
+        """
+        In-process job queue backed by a bounded worker pool.
+
+        :param name: Name used for the worker threads and log lines.
+        :param max_workers: Number of jobs that run at the same time; the rest wait in the queue.
+        """
+        self._name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._pending: Dict[int, Future] = {}
+
+    def submit(self, job_id: int, func: Callable, *args, **kwargs) -> Future:
+        logger.info(f"[Jobs] Queue {self._name} job {job_id}")
+        future = self._executor.submit(func, job_id, *args, **kwargs)
+        self._pending[job_id] = future
+        future.add_done_callback(lambda _: self._pending.pop(job_id, None))
+        return future
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def shutdown(self):
+        logger.info(
+            f"[Jobs] Shutting down {self._name} with {self.pending()} pending jobs"
+        )
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+thread_job_queue = JobQueue("thread-jobs", THREAD_JOB_WORKERS)
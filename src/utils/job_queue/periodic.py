@@ -0,0 +1,37 @@
+import threading
+from typing import Callable
+
+from src.config import logger
+
+
+class PeriodicTask:
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        """
+        Runs `func` on a daemon thread right away and then every `interval` seconds.
+
+        Exceptions are logged and do not stop the schedule.
+        """
+        self.name = name
+        self._interval = interval
+        self._func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            try:
+                self._func()
+            except Exception as e:
+                logger.error(f"[Jobs] Periodic task {self.name} failed: {e}")
+            if self._stop.wait(self._interval):
+                return
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,31 @@
+from src.database.init_tidb import tidb_session
+from src.database.categories import categorize_threads
+from src.database.projections import refresh_projections
+from src.config import (
+    CATEGORY_SWEEP_INTERVAL,
+    PROJECTION_SWEEP_INTERVAL,
+    ACCESS_FLUSH_INTERVAL,
+)
+from src.utils.job_queue.periodic import PeriodicTask
+from src.utils.job_queue.access_tracker import thread_access_tracker
+
+
+def sweep_categories():
+    with tidb_session() as db:
+        categorize_threads(db)
+
+
+def sweep_projections():
+    with tidb_session() as db:
+        refresh_projections(db)
+
+
+category_sweeper = PeriodicTask(
+    "category-sweeper", CATEGORY_SWEEP_INTERVAL, sweep_categories
+)
+projection_sweeper = PeriodicTask(
+    "projection-sweeper", PROJECTION_SWEEP_INTERVAL, sweep_projections
+)
+access_flusher = PeriodicTask(
+    "access-flusher", ACCESS_FLUSH_INTERVAL, thread_access_tracker.flush
+)
@@ -0,0 +1,69 @@
+from src.database.init_tidb import tidb_session
+from src.database.jobs import update_thread_job, fail_thread_job
+from src.database.statistics import insert_raw_data, insert_processed_data
+from src.database.threads import create_thread, remove_thread_by_id
+from src.utils.openai.embeddings.generate_embeddings import get_embeddings
+from src.utils.openai.query_processor.process_query import process_query
+from src.utils.data_generator.data_handler import fetch_trend_data, process_trend_data
+
+from src.config import logger  # Import the logger
+
+
+def set_job_stage(job_id: int, stage: str, progress: int, thread_id: int = None):
+    with tidb_session() as db:
+        update_thread_job(job_id, "running", stage, progress, db, thread_id=thread_id)
+
+
+def run_thread_initiation(job_id: int, user_id: int, user_query: str, country: str):
+    """
+    Builds a new thread for the user's query and records progress on the job row.
+
+    Runs the keyword extraction, embeddings, SerpAPI fetch and statistics processing
+    that POST /threads/ used to run inline. On failure the partially created thread is removed
+    and the job is marked as failed with the error message.
+
+    A database connection is only held for each write, never while waiting on OpenAI
+    or SerpAPI.
+    """
+    thread_id = None
+    try:
+        set_job_stage(job_id, "extracting_keywords", 10)
+        query_metadata = process_query(user_query)
+        keywords = query_metadata.get("keywords", [])
+        thread_name = query_metadata.get("name", "Untitled Thread")
+
+        set_job_stage(job_id, "embedding", 30)
+        query_embeddings = get_embeddings(user_query)
+        keywords_embeddings = get_embeddings(", ".join(keywords))
+
+        with tidb_session() as db:
+            update_thread_job(job_id, "running", "creating_thread", 40, db)
+            thread_id = create_thread(
+                user_id=user_id,
+                name=thread_name,
+                query=user_query,
+                country=country,
+                query_embeddings=query_embeddings,
+                keywords=keywords,
+                keywords_embeddings=keywords_embeddings,
+                db=db,
+            )
+
+        set_job_stage(job_id, "fetching_trend_data", 50, thread_id=thread_id)
+        trend_data = fetch_trend_data(keywords, country)
+        with tidb_session() as db:
+            insert_raw_data(thread_id, trend_data, db)
+
+        set_job_stage(job_id, "processing_statistics", 85)
+        processed_data = process_trend_data(trend_data)
+        with tidb_session() as db:
+            insert_processed_data(thread_id, trend_data.queries, processed_data, db)
+            update_thread_job(job_id, "completed", "completed", 100, db)
+        logger.info(f"[Jobs] Thread job {job_id} completed with thread id: {thread_id}")
+
+    except Exception as e:
+        logger.error(f"[Jobs] Thread job {job_id} failed: {e}")
+        with tidb_session() as db:
+            if thread_id is not None:
+                remove_thread_by_id(thread_id, db)
+            fail_thread_job(job_id, str(e), db)
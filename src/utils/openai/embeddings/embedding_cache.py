@@ -0,0 +1,155 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_SIZE
+
+CREATE_EMBEDDING_CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS embedding_cache (
+        key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        vector BLOB NOT NULL,
+        created_at REAL NOT NULL
+    );
+"""
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, memory_size: int):
+        """
+        Two-tier cache of embeddings keyed by (model name, sha256 of the exact text embedded).
+
+        Vectors are stored as float32, and both hits and stores return them as such, so a
+        text gets the same embedding whether or not it was cached.
+
+        :param path: Location of the SQLite database holding the persistent tier.
+        :param memory_size: Number of embeddings kept in the in-memory LRU tier.
+        """
+        self._path = path
+        self._memory_size = memory_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "bytes_saved": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL;")
+            self._connection.execute(CREATE_EMBEDDING_CACHE_TABLE_SQL)
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def cache_key(model: str, text: str) -> str:
+        digest = hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+        return f"{model}:{digest}"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look texts up in memory first, then on disk. Disk hits are promoted to memory.
+
+        Returns one embedding per text, or None where the text is not cached.
+        """
+        keys = [self.cache_key(model, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        from_disk = set()
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = (
+                    self._connect()
+                    .execute(
+                        f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders});",
+                        missing,
+                    )
+                    .fetchall()
+                )
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype="<f4")
+                    found[key] = vector
+                    from_disk.add(key)
+                    self._remember(key, vector)
+
+            results = []
+            for key in keys:
+                vector = found.get(key)
+                if vector is None:
+                    self._counters["misses"] += 1
+                    results.append(None)
+                else:
+                    tier = "disk_hits" if key in from_disk else "memory_hits"
+                    self._counters[tier] += 1
+                    self._counters["bytes_saved"] += vector.nbytes
+                    results.append(vector.tolist())
+        return results
+
+    def set_many(
+        self, model: str, texts: List[str], embeddings: List[List[float]]
+    ) -> List[List[float]]:
+        """Stores the embeddings and returns them as later hits will, rounded to float32."""
+        rows, stored = [], []
+        now = time.time()
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.cache_key(model, text)
+                vector = np.asarray(embedding, dtype="<f4")
+                self._remember(key, vector)
+                rows.append((key, model, vector.shape[0], vector.tobytes(), now))
+                stored.append(vector.tolist())
+
+            connection = self._connect()
+            connection.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, model, dim, vector, created_at) "
+                "VALUES (?, ?, ?, ?, ?);",
+                rows,
+            )
+            connection.commit()
+            self._counters["stores"] += len(rows)
+        return stored
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def set(self, model: str, text: str, embedding: List[float]) -> List[float]:
+        return self.set_many(model, [text], [embedding])[0]
+
+    def stats(self) -> Dict:
+        counters = dict(self._counters)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_rate"] = hits / lookups if lookups else 0.0
+        counters["memory_entries"] = len(self._memory)
+        return counters
+
+
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_SIZE)
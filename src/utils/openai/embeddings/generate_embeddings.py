@@ -1,7 +1,27 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import tiktoken
+from tenacity import (
+    before_sleep_log,
+    retry,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
 from src.utils.openai.init_openai import init_openai_embeddings
+from src.utils.openai.embeddings.embedding_cache import embedding_cache
+from src.config import logger
 
 embeddings_model = init_openai_embeddings()
 
+# OpenAI limits: tokens per input and total tokens per embeddings request
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_TOKENS = 300_000
+
+encoding = tiktoken.get_encoding("cl100k_base")
+
 
 def get_embeddings(text: str):
     """
@@ -14,6 +34,95 @@ def get_embeddings(text: str):
         Dict: The embeddings for the input text.
     """
     text = text.replace("\n", " ")
-    embeeded_text = embeddings_model.embed_query(text)
+    embeeded_text = embedding_cache.get(embeddings_model.model, text)
+    if embeeded_text is None:
+        embeeded_text = embedding_cache.set(
+            embeddings_model.model, text, embeddings_model.embed_query(text)
+        )
 
     return embeeded_text
+
+
+def get_embeddings_batch(
+    texts: List[str], batch_size: int = 256, max_concurrency: int = 4
+) -> List[List[float]]:
+    """
+    Get embeddings for many texts with as few requests as possible.
+
+    Cached texts are served from the embedding cache. The rest are truncated to the model's
+    input limit and grouped into batches of at most `batch_size` texts and MAX_BATCH_TOKENS tokens. Batches are sent concurrently and
+    retried with exponential backoff on failure.
+
+    Args:
+        texts (List[str]): The input texts.
+        batch_size (int): Maximum number of texts per request.
+        max_concurrency (int): Maximum number of requests in flight.
+
+    Returns:
+        List[List[float]]: One embedding per input text, in the same order.
+    """
+    prepared = [truncate_text(str(text).replace("\n", " ")) for text in texts]
+    embeddings = embedding_cache.get_many(embeddings_model.model, prepared)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if not missing:
+        return embeddings
+
+    batches = make_token_batches([prepared[i] for i in missing], batch_size)
+    logger.info(
+        f"[OpenAI] Embed {len(missing)} of {len(prepared)} texts in {len(batches)} "
+        f"batches with concurrency {max_concurrency}"
+    )
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        batch_results = executor.map(
+            lambda batch: embed_documents_with_retry(
+                [prepared[missing[i]] for i in batch]
+            ),
+            batches,
+        )
+        for batch, batch_embeddings in zip(batches, batch_results):
+            batch_embeddings = embedding_cache.set_many(
+                embeddings_model.model,
+                [prepared[missing[i]] for i in batch],
+                batch_embeddings,
+            )
+            for i, embedding in zip(batch, batch_embeddings):
+                embeddings[missing[i]] = embedding
+
+    return embeddings
+
+
+def truncate_text(text: str) -> str:
+    tokens = encoding.encode(text)
+    if len(tokens) <= MAX_INPUT_TOKENS:
+        return text
+    return encoding.decode(tokens[:MAX_INPUT_TOKENS])
+
+
+def make_token_batches(texts: List[str], batch_size: int) -> List[List[int]]:
+    """
+    Group text indices into consecutive batches bounded by count and total token length.
+    """
+    batches, current, current_tokens = [], [], 0
+    for index, text in enumerate(texts):
+        n_tokens = len(encoding.encode(text))
+        if current and (
+            len(current) >= batch_size or current_tokens + n_tokens > MAX_BATCH_TOKENS
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += n_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+@retry(
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(6),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+def embed_documents_with_retry(texts: List[str]) -> List[List[float]]:
+    return embeddings_model.embed_documents(texts)
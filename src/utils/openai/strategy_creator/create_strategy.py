@@ -11,28 +11,92 @@ from src.utils.openai.strategy_creator.models import (
     ColorPalettes,
 )
 from src.utils.openai.strategy_creator.generate_logo import generate_logo_image
+from src.utils.openai.strategy_creator.task_graph import TaskGraph
 
 from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
+import asyncio
 import json
 from collections import defaultdict
 
 
-from src.database.init_tidb import init_tidb
 from src.database import TiDBHandler
 from src.database.strategies import vector_search_brand
 from src.config import logger
 
 llm = init_openai_llm()
-db = init_tidb()
 
 
-def create_general_strategy(
-    business_query: str, trending_keywords: list, given_data
+async def create_strategies(
+    business_query: str, trending_keywords: list, given_data, db: TiDBHandler
 ) -> dict:
+    """
+    Generate the marketing strategy and brand identity for a snapshot.
+
+    The LLM, vector search and DALL-E calls run as a dependency graph, so the trend summary
+    runs alongside the strategy and the slogan alongside the color palette.
+
+    Returns:
+        dict: The strategy metadata merged with the trend summary and brand identities.
+    """
     logger.info(f"[OpenAI] Generate Strategy with business query: {business_query}")
-    data = process_data_for_llm(given_data)
+    graph = TaskGraph("strategy_creator")
+    graph.add("data", lambda: process_data_for_llm(given_data))
+    graph.add(
+        "strategy",
+        lambda data: create_general_strategy(business_query, trending_keywords, data),
+        depends_on=["data"],
+    )
+    graph.add(
+        "trend_summary", lambda data: generate_trend_summary(data), depends_on=["data"]
+    )
+    graph.add(
+        "brand_search",
+        lambda strategy: asyncio.to_thread(vector_search_brand, strategy, db),
+        depends_on=["strategy"],
+    )
+    graph.add(
+        "color_palette",
+        lambda strategy, brand_search: generate_color_palette(
+            strategy, extract_competitor_palettes(brand_search)
+        ),
+        depends_on=["strategy", "brand_search"],
+    )
+    graph.add(
+        "slogan",
+        lambda strategy, brand_search: generate_slogan(
+            strategy["brand_name"],
+            strategy["target_audience"],
+            strategy["brand_description"],
+            brand_search.get("slogans", []),
+        ),
+        depends_on=["strategy", "brand_search"],
+    )
+    graph.add(
+        "logo",
+        lambda strategy, color_palette: asyncio.to_thread(
+            generate_logo_image, describe_logo(strategy, color_palette)
+        ),
+        depends_on=["strategy", "color_palette"],
+    )
+    results = await graph.run()
 
+    strategy_metadata = dict(results["strategy"])
+    strategy_metadata.update(
+        {
+            "trend_summary": results["trend_summary"],
+            "brand_slogan": results["slogan"],
+            "brand_color_palette": results["color_palette"],
+            "logo_image": results["brand_search"].get("logos"),
+            "brand_logo": results["logo"],
+        }
+    )
+    return strategy_metadata
+
+
+async def create_general_strategy(
+    business_query: str, trending_keywords: list, data: dict
+) -> dict:
     parser = PydanticOutputParser(pydantic_object=StrategyMetadata)
 
     prompt = PromptTemplate(
@@ -43,7 +107,7 @@ def create_general_strategy(
 
     # Set up a parser and generate output
     llm_chain = prompt | llm
-    output = llm_chain.invoke(
+    output = await llm_chain.ainvoke(
         {
             "business_query": business_query,
             "trending_keywords": trending_keywords,
@@ -51,22 +115,12 @@ def create_general_strategy(
         }
     )
     strategy = parser.invoke(output)
-    trend_summary = generate_trend_summary(data)
-
-    strategy_metadata = strategy.dict()
-    strategy_metadata["trend_summary"] = trend_summary
-    return strategy_metadata
+    return strategy.dict()
 
 
-def create_brand_identities(strategies_metadata: dict, db: TiDBHandler) -> dict:
-    logger.info(
-        f"[OpenAI] Create brand identitites with strategies data: {strategies_metadata}"
-    )
-    brand_identities = vector_search_brand(strategies_metadata, db)
-    slogan_list = brand_identities.get("slogans", [])
-
+def extract_competitor_palettes(brand_identities: dict) -> list:
     # Convert colors to RGB format
-    color_palette_list = [
+    return [
         [
             rgb_to_hex(json.loads(color["rgb"])[i : i + 3])
             for i in range(0, len(json.loads(color["rgb"])), 3)
@@ -74,32 +128,14 @@ def create_brand_identities(strategies_metadata: dict, db: TiDBHandler) -> dict:
         for color in brand_identities.get("colors", [])
     ]
 
-    # Generate color palette using LLM
-    color_palette_list = generate_color_palette(strategies_metadata, color_palette_list)
 
-    # Generate slogan using LLM
-    slogan = generate_slogan(
-        strategies_metadata["brand_name"],
-        strategies_metadata["target_audience"],
-        strategies_metadata["brand_description"],
-        slogan_list,
-    )
-
-    # Generate logo image using DALL-E
+def describe_logo(strategies_metadata: dict, color_palette_list: list) -> str:
     brand_name_description = f"The brand name is {strategies_metadata['brand_name']}"
     brand_description_description = (
         f"The brand description is {strategies_metadata['brand_description']}"
     )
     color_pallete_description = f"Try to use colors from: {color_palette_list}"
-    logo_description = f"{brand_name_description}. {brand_description_description}. {color_pallete_description}"
-    logo_image = generate_logo_image(logo_description)
-
-    return {
-        "brand_slogan": slogan,
-        "brand_color_palette": color_palette_list,
-        "logo_image": brand_identities.get("logos"),
-        "brand_logo": logo_image,
-    }
+    return f"{brand_name_description}. {brand_description_description}. {color_pallete_description}"
 
 
 def process_data_for_llm(data: dict) -> dict:
@@ -193,7 +229,7 @@ def process_data_for_llm(data: dict) -> dict:
     return processed_data
 
 
-def generate_trend_summary(processed_data: dict) -> dict:
+async def generate_trend_summary(processed_data: dict) -> dict:
     logger.info(
         f"[OpenAI] Generate trend summary data with processed data: {processed_data}"
     )
@@ -206,12 +242,14 @@ def generate_trend_summary(processed_data: dict) -> dict:
     )
 
     llm_chain = prompt | llm
-    output = llm_chain.invoke({"data": processed_data})
+    output = await llm_chain.ainvoke({"data": processed_data})
 
     return parser.invoke(output).trend_summary
 
 
-def generate_color_palette(strategies_metadata: dict, color_palette_list: list) -> list:
+async def generate_color_palette(
+    strategies_metadata: dict, color_palette_list: list
+) -> list:
     logger.info(
         f"[OpenAI] Generate color palette with strategies data: {strategies_metadata}, {color_palette_list}"
     )
@@ -224,7 +262,7 @@ def generate_color_palette(strategies_metadata: dict, color_palette_list: list)
     )
 
     llm_chain = prompt | llm
-    output = llm_chain.invoke(
+    output = await llm_chain.ainvoke(
         {
             "competitor_color_palettes": color_palette_list,
             "brand_description": strategies_metadata["brand_description"],
@@ -234,7 +272,7 @@ def generate_color_palette(strategies_metadata: dict, color_palette_list: list)
     return parser.invoke(output).color_palettes
 
 
-def generate_slogan(
+async def generate_slogan(
     brand_name: str, target_audience: str, brand_description: str, slogans: list
 ) -> str:
     logger.info(
@@ -251,7 +289,7 @@ def generate_slogan(
     )
 
     llm_chain = prompt | llm
-    output = llm_chain.invoke(
+    output = await llm_chain.ainvoke(
         {
             "brand_name": brand_name,
             "target_audience": target_audience,
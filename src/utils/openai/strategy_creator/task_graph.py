@@ -0,0 +1,65 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from src.config import logger
+
+
+class TaskGraph:
+    def __init__(self, name: str):
+        """
+        Runs async tasks as a dependency graph, starting each node as soon as its inputs are ready.
+
+        :param name: Name used in the timing log line.
+        """
+        self.name = name
+        self.timings: Dict[str, float] = {}
+        self._nodes: Dict[str, tuple] = {}
+
+    def add(self, name: str, func: Callable, depends_on: Iterable[str] = ()):
+        """
+        Register a node.
+
+        :param name: Node name, also the keyword under which its result is passed to dependants.
+        :param func: Callable receiving one keyword argument per dependency; may return an awaitable.
+        :param depends_on: Names of the nodes whose results this node needs.
+        """
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._nodes:
+                raise ValueError(f"Unknown dependency '{dependency}' for node '{name}'")
+        self._nodes[name] = (func, depends_on)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Execute every node and return their results by name.
+
+        Nodes must be added after their dependencies, which rules out cycles. If a node fails,
+        the remaining nodes are cancelled and the exception is raised.
+        """
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(name: str, func: Callable, depends_on: tuple):
+            inputs = {dependency: await tasks[dependency] for dependency in depends_on}
+            node_started = time.perf_counter()
+            result = func(**inputs)
+            if inspect.isawaitable(result):
+                result = await result
+            self.timings[name] = round(time.perf_counter() - node_started, 3)
+            return result
+
+        for name, (func, depends_on) in self._nodes.items():
+            tasks[name] = asyncio.create_task(run_node(name, func, depends_on))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        self.timings["total"] = round(time.perf_counter() - started, 3)
+        logger.info(f"[TaskGraph] {self.name} node timings (s): {self.timings}")
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def assign_clusters(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid for each point."""
+    points = np.asarray(points, dtype=np.float32)
+    if points.size == 0:
+        return np.empty(0, dtype=np.int64)
+    distances = (
+        (points**2).sum(axis=1)[:, None]
+        - 2 * points @ centroids.T
+        + (centroids**2).sum(axis=1)[None, :]
+    )
+    return distances.argmin(axis=1)
+
+
+def kmeans(points: np.ndarray, k: int, n_iter: int = 50, seed: int = 0):
+    """
+    Lloyd's k-means with k-means++ seeding.
+
+    Returns (centroids, labels). k is capped at the number of points.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+
+    centroids = [points[rng.integers(len(points))]]
+    closest = ((points - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        if total == 0:
+            break
+        centroids.append(points[rng.choice(len(points), p=closest / total)])
+        closest = np.minimum(closest, ((points - centroids[-1]) ** 2).sum(axis=1))
+    centroids = np.array(centroids, dtype=np.float32)
+
+    labels = assign_clusters(points, centroids)
+    for _ in range(n_iter):
+        updated = centroids.copy()
+        for cluster in range(len(centroids)):
+            members = points[labels == cluster]
+            if len(members):
+                updated[cluster] = members.mean(axis=0)
+        new_labels = assign_clusters(points, updated)
+        centroids = updated
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return centroids, labels
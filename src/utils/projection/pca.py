@@ -0,0 +1,66 @@
+import numpy as np
+
+# Above this many rows fit_pca switches from an exact SVD to a randomized one
+RANDOMIZED_SVD_MIN_ROWS = 5000
+
+
+def randomized_svd(
+    matrix: np.ndarray,
+    n_components: int,
+    n_oversamples: int = 10,
+    n_iter: int = 4,
+    seed: int = 0,
+):
+    """
+    Truncated SVD by random range finding (Halko et al.).
+
+    Only multiplies matrix by thin (dim x (n_components + n_oversamples)) blocks,
+    so the cost grows linearly with the number of rows.
+    """
+    rng = np.random.default_rng(seed)
+    n_random = min(n_components + n_oversamples, min(matrix.shape))
+    q = matrix @ rng.standard_normal((matrix.shape[1], n_random)).astype(matrix.dtype)
+    for _ in range(n_iter):
+        q, _ = np.linalg.qr(q)
+        q, _ = np.linalg.qr(matrix.T @ q)
+        q = matrix @ q
+    q, _ = np.linalg.qr(q)
+    u_small, s, vt = np.linalg.svd(q.T @ matrix, full_matrices=False)
+    return (q @ u_small)[:, :n_components], s[:n_components], vt[:n_components]
+
+
+def fit_pca(embeddings: np.ndarray, n_components: int):
+    """
+    Fits a PCA basis on the rows of embeddings.
+
+    Returns (mean, components) where components has shape (n_components, dim).
+    Signs are fixed so the largest loading of each component is positive, which
+    keeps the projection stable between refits on similar data. With fewer rows than
+    n_components the missing components are zero, so their coordinates are always 0.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    mean = embeddings.mean(axis=0)
+    centered = embeddings - mean
+    if len(embeddings) >= RANDOMIZED_SVD_MIN_ROWS:
+        _, _, vt = randomized_svd(centered, n_components)
+    else:
+        _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    components = vt[:n_components]
+    signs = np.sign(
+        components[np.arange(len(components)), np.abs(components).argmax(axis=1)]
+    )
+    signs[signs == 0] = 1
+    components = components * signs[:, None]
+    if len(components) < n_components:
+        padding = np.zeros(
+            (n_components - len(components), components.shape[1]), dtype=np.float32
+        )
+        components = np.vstack([components, padding])
+    return mean, components
+
+
+def project(embeddings: np.ndarray, mean: np.ndarray, components: np.ndarray):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.size == 0:
+        return np.empty((0, len(components)), dtype=np.float32)
+    return ((embeddings - mean) @ components.T).astype(np.float32)
@@ -0,0 +1,78 @@
+import random
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import REFRESH_TIERS, REFRESH_JITTER
+
+
+def interest_volatility(interest_over_time: Optional[List[Dict]]) -> Optional[float]:
+    """
+    How much a thread's Interest Over Time moves, from 0 (flat) to 1 (very volatile).
+
+    Mean absolute day-to-day change of each keyword series relative to its mean,
+    averaged over keywords. None when there is no series to measure.
+    """
+    records = interest_over_time
+    if not records:
+        return None
+
+    keywords = [key for key in records[0] if key not in ("Date", "Timestamp")]
+    scores = []
+    for keyword in keywords:
+        values = np.array([record.get(keyword) or 0 for record in records], dtype=float)
+        if len(values) > 1:
+            scores.append(np.abs(np.diff(values)).mean() / max(values.mean(), 1.0))
+    return float(min(np.mean(scores), 1.0)) if scores else None
+
+
+def refresh_interval(
+    idle: timedelta, volatility: Optional[float]
+) -> Optional[timedelta]:
+    """
+    Refresh interval for a thread last viewed `idle` ago, or None if it should not be refreshed.
+
+    The interval comes from REFRESH_TIERS and is shortened by up to half for volatile data.
+    """
+    for max_idle_days, interval_hours in REFRESH_TIERS:
+        if idle <= timedelta(days=max_idle_days):
+            return timedelta(hours=interval_hours) / (1 + (volatility or 0.0))
+    return None
+
+
+def plan_due_threads(rows: List[Dict], limit: int) -> Tuple[List[int], List[Tuple]]:
+    """
+    Splits the threads returned by fetch_due_threads into work for this tick.
+
+    Returns:
+    - The ids to refresh now, most overdue first, at most `limit` of them. Overdue threads
+      past the limit stay due and are picked up by the next tick.
+    - (thread_id, last_refreshed_at, next_refresh_at) schedule rows for threads that are not
+      due after all (recently refreshed or idle); next_refresh_at is None for idle threads.
+      Next times get +/- REFRESH_JITTER of random spread so refreshes do not bunch up.
+    """
+    due, schedule = [], []
+    for row in rows:
+        now = row["now"]
+        last_seen = row["last_accessed_at"] or row["created_at"]
+        interval = refresh_interval(now - last_seen, row["volatility"])
+        last_refreshed = row["last_refreshed_at"]
+
+        if interval is None:
+            schedule.append((row["id"], last_refreshed, None))
+        elif last_refreshed is not None and now - last_refreshed < interval * (
+            1 - REFRESH_JITTER
+        ):
+            spread = random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)
+            schedule.append(
+                (row["id"], last_refreshed, last_refreshed + interval * spread)
+            )
+        else:
+            overdue = (
+                (now - last_refreshed) / interval if last_refreshed else float("inf")
+            )
+            due.append((overdue, row["id"]))
+
+    due.sort(reverse=True)
+    return [thread_id for _, thread_id in due[:limit]], schedule
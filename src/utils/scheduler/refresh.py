@@ -0,0 +1,206 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+from tenacity import (
+    Retrying,
+    before_sleep_log,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from src.database.init_tidb import tidb_session
+from src.database.refresh import (
+    start_refresh_run,
+    fetch_interrupted_refresh_run,
+    abort_refresh_run,
+    fetch_succeeded_thread_ids,
+    record_refresh_checkpoints,
+    finish_refresh_run,
+    record_refresh_outcome,
+)
+from src.database.statistics import insert_raw_data_many, insert_processed_data_many
+from src.utils.data_generator.data_handler import fetch_trend_data, process_trend_data
+from src.utils.data_generator.rate_limiter import serpapi_rate_limiter
+from src.utils.scheduler.priority import interest_volatility
+from src.utils.serialization import dumps_bytes, hash_bytes
+from src.config import REFRESH_WORKERS, REFRESH_MAX_ATTEMPTS, logger
+
+
+class RefreshError(Exception):
+    pass
+
+
+def fetch_with_retry(keywords: List[str], country: str, attempts: List[int]):
+    """
+    Fetches the trend data, retrying with exponential backoff when nothing usable came back.
+
+    `attempts` is a one-element counter so callers can report it even after the final failure.
+    """
+    for attempt in Retrying(
+        stop=stop_after_attempt(REFRESH_MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=2, max=60),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    ):
+        with attempt:
+            attempts[0] += 1
+            trend_data = fetch_trend_data(keywords, country, update=True)
+            if not trend_data.has_data():
+                raise RefreshError("no SerpAPI source returned data")
+    return trend_data
+
+
+def refresh_key(keywords: str, gl: str) -> Tuple[str, str]:
+    """Canonical (keywords, gl) key; keyword order is kept since the first one is the main keyword."""
+    canonical = ",".join(keyword.strip().lower() for keyword in keywords.split(","))
+    return canonical, (gl or "").strip().lower()
+
+
+def plan_refresh(items: List[Dict]) -> List[Dict]:
+    """
+    Groups threads whose refresh would issue identical SerpAPI queries.
+
+    Each group is fetched once and its result written to every thread in it.
+    """
+    groups = {}
+    for item in items:
+        key = refresh_key(item["keywords"], item["queries"].get("gl", ""))
+        group = groups.setdefault(
+            key,
+            {
+                "keywords": item["keywords"],
+                "gl": item["queries"].get("gl", ""),
+                "thread_ids": [],
+            },
+        )
+        if item["thread_id"] not in group["thread_ids"]:
+            group["thread_ids"].append(item["thread_id"])
+    return list(groups.values())
+
+
+def refresh_group(run_id: int, group: Dict) -> Dict:
+    """
+    Fetches one keyword/geo group, writes it to all of its threads and checkpoints them.
+
+    The fetch, its retries and the statistics run before a database connection is
+    taken, so a slow group never holds one of the pool's connections.
+    """
+    thread_ids = group["thread_ids"]
+    attempts = [0]
+    try:
+        trend_data = fetch_with_retry(
+            group["keywords"].split(","), group["gl"], attempts
+        )
+        processed_data = process_trend_data(trend_data)
+        error = None
+    except Exception as e:
+        logger.error(f"[Refresh] Threads {thread_ids} failed: {e}")
+        error = str(e)
+
+    with tidb_session() as db:
+        if error is None:
+            try:
+                insert_raw_data_many(thread_ids, trend_data, db)
+                insert_processed_data_many(
+                    thread_ids, trend_data.queries, processed_data, db
+                )
+            except Exception as e:
+                logger.error(f"[Refresh] Threads {thread_ids} failed: {e}")
+                error = str(e)
+        status = "succeeded" if error is None else "failed"
+
+        try:
+            record_refresh_checkpoints(
+                run_id, thread_ids, status, attempts[0], db, error=error
+            )
+            record_refresh_outcome(
+                thread_ids,
+                status == "succeeded",
+                db,
+                volatility=(
+                    interest_volatility(trend_data.get("InterestOverTime"))
+                    if status == "succeeded"
+                    else None
+                ),
+            )
+        except Exception as e:
+            logger.error(
+                f"[Refresh] Could not record outcome of threads {thread_ids}: {e}"
+            )
+
+    return {"thread_ids": thread_ids, "status": status, "attempts": attempts[0]}
+
+
+def run_refresh(items: List[Dict], workers: int = REFRESH_WORKERS) -> Dict:
+    """
+    Refreshes the given threads on a bounded worker pool and returns a summary report.
+
+    Threads sharing keywords and country are fetched once (see plan_refresh).
+    Progress is checkpointed per thread; if the previous run was interrupted while
+    refreshing the same threads it is resumed, skipping the threads it already refreshed.
+    An interrupted run for a different set of threads is marked aborted instead.
+    A failing group never stops the run.
+    SerpAPI throughput is capped by the shared token bucket in cached_search; the
+    summary reports how long, in wall-clock seconds, this run was held back by it.
+    """
+    started = time.monotonic()
+    waited_before = serpapi_rate_limiter.waited
+    items_hash = hash_bytes(dumps_bytes(sorted({item["thread_id"] for item in items})))
+    with tidb_session() as db:
+        interrupted = fetch_interrupted_refresh_run(db)
+        if interrupted is not None and interrupted[1] != items_hash:
+            abort_refresh_run(interrupted[0], db)
+            interrupted = None
+
+        if interrupted is None:
+            run_id, done = start_refresh_run(len(items), items_hash, db), set()
+        else:
+            run_id = interrupted[0]
+            done = fetch_succeeded_thread_ids(run_id, db)
+            logger.info(
+                f"[Refresh] Resuming run {run_id}, {len(done)} threads already refreshed"
+            )
+
+    pending = [item for item in items if item["thread_id"] not in done]
+    groups = plan_refresh(pending)
+    logger.info(
+        f"[Refresh] {len(pending)} threads to refresh in {len(groups)} unique keyword/geo groups"
+    )
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh") as pool:
+        futures = [pool.submit(refresh_group, run_id, group) for group in groups]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    refreshed = sum(len(result["thread_ids"]) for result in results)
+    failed = [
+        thread_id
+        for result in results
+        if result["status"] == "failed"
+        for thread_id in result["thread_ids"]
+    ]
+    summary = {
+        "run_id": run_id,
+        "status": "completed_with_errors" if failed else "completed",
+        "total": len(items),
+        "skipped": len(items) - len(pending),
+        "succeeded": refreshed - len(failed),
+        "failed": len(failed),
+        "groups": len(groups),
+        "retried": sum(1 for result in results if result["attempts"] > 1),
+        "failed_threads": failed,
+        "rate_limit_wait_seconds": round(
+            serpapi_rate_limiter.waited - waited_before, 1
+        ),
+        "duration_seconds": round(time.monotonic() - started, 1),
+    }
+    with tidb_session() as db:
+        finish_refresh_run(run_id, summary, db)
+
+    report = {key: value for key, value in summary.items() if key != "failed_threads"}
+    logger.info(f"[Refresh] Run finished: {report}")
+    if failed:
+        logger.warning(f"[Refresh] Failed threads: {failed}")
+    return summary
@@ -1,13 +1,22 @@
-import schedule
 import time
 from datetime import datetime
 from pytz import timezone
 import logging
-import json
-from src.database.init_tidb import init_tidb
-from fastapi import HTTPException
-from src.utils.data_generator.data_handler import update_raw_data
-from src.config import logger
+from src.database.init_tidb import tidb_session
+from src.database.counters import rollup_dashboard_counters
+from src.database.retention import compact_statistics_history
+from src.database.settings import get_app_setting, set_app_setting
+from src.database.refresh import fetch_due_threads, schedule_thread_refreshes
+from src.database.sql_queries import (
+    SCAN_LATEST_RAW_QUERIES_QUERY,
+    SELECT_LATEST_RAW_QUERIES_BY_IDS_QUERY,
+)
+from src.utils.scheduler.refresh import run_refresh
+from src.utils.scheduler.priority import plan_due_threads
+from src.utils.serialization import loads
+from src.config import REFRESH_TICK_INTERVAL, REFRESH_MAX_PER_TICK, logger
+
+DASHBOARD_ROLLUP_DATE = "dashboard_rollup_date"
 
 # Configure logging
 logging.basicConfig(
@@ -15,81 +24,113 @@ logging.basicConfig(
 )
 
 
-def fetch_threads_and_queries(db):
+def fetch_threads_and_queries(db, batch_size: int = 500):
+    """
+    Yields each thread with the queries of its latest raw_data row, scanning threads
+    in keyset-paginated batches instead of loading them whole.
+    """
     logger.info(f"[OpenAI] Retrieve threads and queries")
-    query = "SELECT DISTINCT Thread_ID, queries FROM Raw_data"
-    threads_queries = []
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute(query)
-            result = cursor.fetchall()
-
-        for row in result:
-            thread_id = row[0]
-            queries_json = row[1]
-            queries = json.loads(queries_json)  # Parse the JSON string
-            keywords = queries.pop("q")  # Extract keywords from the "q" key
-
-            threads_queries.append(
-                {"thread_id": thread_id, "keywords": keywords, "queries": queries}
-            )
+        for rows in db.scan(SCAN_LATEST_RAW_QUERIES_QUERY, batch_size=batch_size):
+            yield from rows_to_refresh_items(rows)
     except Exception as e:
         logging.error(f"Failed to fetch threads and queries: {e}")
 
-    return threads_queries
-
 
-def run_scheduler(db):
-    logger.info(f"[OpenAI] Run scheduler")
-    threads_queries = fetch_threads_and_queries(db)
+def fetch_queries_for_threads(thread_ids, db):
+    """Refresh items for the given threads, from their latest raw_data row."""
+    if not thread_ids:
+        return []
+    query = SELECT_LATEST_RAW_QUERIES_BY_IDS_QUERY.format(
+        ids=", ".join(["%s"] * len(thread_ids))
+    )
+    with db.connection.cursor() as cursor:
+        cursor.execute(query, thread_ids)
+        return list(rows_to_refresh_items(cursor.fetchall()))
 
-    for item in threads_queries:
-        thread_id = item["thread_id"]
-        keywords = item["keywords"].split(",")
-        raw_queries = item["queries"]
-        country = raw_queries.get("gl", "")
-
-        try:
-            # Fetch and process trend data with update - True
-            update_raw_data(thread_id, keywords, country, db, True)
-            print("Update completed for thread_id:", thread_id)
-
-        except Exception as e:
-            logging.error(f"Error in updating threadID: {thread_id}. Error: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"An error occurred while initiating the query: {str(e)}",
-            )
 
+def rows_to_refresh_items(rows):
+    for thread_id, queries_json in rows:
+        if queries_json is None:
+            continue  # thread has no raw data yet
 
-def job():
-    """Job to be scheduled."""
-    logging.info("Starting the scheduled update...")
-    # Initialize the TiDBHandler instance for dependency injection\
-    print("Scheduled job is running")  # For quick visibility
-    db = init_tidb()
-    run_scheduler(db)
+        queries = loads(queries_json)  # Parse the JSON string
+        keywords = queries.pop("q")  # Extract keywords from the "q" key
 
+        yield {"thread_id": thread_id, "keywords": keywords, "queries": queries}
 
-def schedule_daily_job():
-    # Schedule the job every day at 12am SGT
-    logger.info(f"[OpenAI] Schedule the job daily at 12am SGT")
-    sgt = timezone("Asia/Singapore")
 
-    def run_at_sgt_midnight():
-        current_time = datetime.now(sgt).time()
-        if current_time.hour == 00 and current_time.minute == 00:
-            job()
+def run_scheduler(db):
+    """Refreshes every thread now, regardless of priority."""
+    logger.info(f"[OpenAI] Run scheduler")
+    threads_queries = list(fetch_threads_and_queries(db))
 
-    # schedule.every().day.at("00:00").do(run_at_sgt_midnight)
-    schedule.every().day.at("00:00").do(run_at_sgt_midnight)
+    # Refreshes run concurrently on their own sessions; failures are reported, not raised
+    return run_refresh(threads_queries)
 
-    logging.info("Scheduler set to run daily at 12am SGT.")
 
+def run_daily_jobs(db):
+    """
+    Daily housekeeping on the first tick after 12am SGT: compacts old statistics history
+    (see retention.py), then rolls up the dashboard counters, which recounts the
+    compacted tables.
+    """
+    today = datetime.now(timezone("Asia/Singapore")).date().isoformat()
+    if get_app_setting(DASHBOARD_ROLLUP_DATE, db) == today:
+        return
+    try:
+        compact_statistics_history(db)
+    except Exception as e:
+        logging.error(f"Failed to compact statistics history: {e}")
+    try:
+        rollup_dashboard_counters(db)
+        set_app_setting(DASHBOARD_ROLLUP_DATE, today, db)
+    except Exception as e:
+        logging.error(f"Failed to roll up dashboard counters: {e}")
+
+
+def run_tick():
+    """
+    One scheduling pass: refreshes the most overdue threads, up to REFRESH_MAX_PER_TICK.
+
+    How often a thread is due depends on how recently it was viewed and how volatile its
+    trend data is (see priority.py); threads nobody has viewed for a long time are skipped.
+    """
+    with tidb_session() as db:
+        run_daily_jobs(db)
+
+        due_ids, schedule = plan_due_threads(
+            fetch_due_threads(db), REFRESH_MAX_PER_TICK
+        )
+        items = fetch_queries_for_threads(due_ids, db)
+
+        # Threads without raw data cannot be refreshed; park them until they are viewed
+        refreshable = {item["thread_id"] for item in items}
+        schedule += [
+            (thread_id, None, None)
+            for thread_id in due_ids
+            if thread_id not in refreshable
+        ]
+        if schedule:
+            schedule_thread_refreshes(schedule, db)
+
+    logger.info(
+        f"[Refresh] Tick: {len(items)} threads due, {len(schedule)} rescheduled"
+    )
+    if items:
+        return run_refresh(items)
+
+
+def run_forever(interval: float = REFRESH_TICK_INTERVAL):
+    logger.info(f"[Refresh] Priority scheduler running every {interval}s")
     while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+        started = time.monotonic()
+        try:
+            run_tick()
+        except Exception as e:
+            logging.error(f"Scheduler tick failed: {e}")
+        time.sleep(max(interval - (time.monotonic() - started), 0))
 
 
 if __name__ == "__main__":
-    schedule_daily_job()
+    run_forever()
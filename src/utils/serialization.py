@@ -0,0 +1,83 @@
+import hashlib
+from decimal import Decimal
+from typing import Any, Optional, Union
+
+import orjson
+import zstandard
+from fastapi.responses import JSONResponse
+
+# numpy arrays and scalars are encoded natively, dict keys may be ints or dates
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+ZSTD_LEVEL = 10
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types orjson does not encode natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        # datetime subclasses such as pandas.Timestamp
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars orjson does not cover, e.g. float16
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """
+    Serializes a value to UTF-8 JSON.
+
+    NaN and infinity become null; datetimes and dates are written as ISO 8601 strings.
+    """
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def dumps(value: Any) -> str:
+    """Like dumps_bytes, as a str for text and JSON columns."""
+    return dumps_bytes(value).decode()
+
+
+def loads(value: Union[str, bytes]) -> Any:
+    return orjson.loads(value)
+
+
+def compress(data: bytes) -> bytes:
+    # Compressor objects are not thread-safe, and cheap to create per call
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def decompress(blob: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(blob)
+
+
+def hash_bytes(data: bytes) -> str:
+    """Short content hash used to detect unchanged payloads."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def load_json_column(value: Optional[Union[str, bytes]]) -> Any:
+    """
+    Parses a JSON column, or returns None if it is empty or invalid.
+
+    Rows written before trend data was serialized once hold each field JSON-encoded
+    twice (a JSON string containing JSON); those are unwrapped transparently.
+    """
+    if value is None:
+        return None
+    try:
+        parsed = orjson.loads(value)
+        if isinstance(parsed, str):
+            parsed = orjson.loads(parsed)
+    except orjson.JSONDecodeError:
+        return None
+    return parsed
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson through dumps_bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
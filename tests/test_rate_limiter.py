@@ -0,0 +1,23 @@
+import threading
+
+from src.utils.data_generator.rate_limiter import TokenBucket
+
+
+def test_waited_counts_overlapping_waits_once():
+    bucket = TokenBucket(rate=10, capacity=1)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Four callers queue behind the burst of one, the last is let through after ~0.4s
+    assert 0.35 <= bucket.waited <= 0.6
+
+
+def test_no_wait_within_burst():
+    bucket = TokenBucket(rate=10, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+
+    assert bucket.waited == 0.0
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.api.dashboard.routes import as_matrix, reduce_embeddings
+from src.utils.projection.pca import fit_pca, project
+
+
+@pytest.mark.parametrize("rows", [1, 2])
+@pytest.mark.parametrize("dims", [2, 3])
+def test_reduce_embeddings_with_fewer_rows_than_dims(rows, dims):
+    rng = np.random.default_rng(0)
+    embeddings = rng.random((rows, 1536))
+    category_embeddings = rng.random((4, 1536))
+
+    queries, categories = reduce_embeddings(embeddings, category_embeddings, dims)
+
+    assert queries.shape == (rows, dims)
+    assert categories.shape == (4, dims)
+    assert as_matrix(queries, dims).shape == (rows, dims)
+    assert np.isfinite(queries).all() and np.isfinite(categories).all()
+
+
+def test_fit_pca_pads_missing_components_with_zeros():
+    embeddings = np.random.default_rng(0).random((1, 1536))
+
+    mean, components = fit_pca(embeddings, 2)
+
+    assert components.shape == (2, 1536)
+    assert not components[1:].any()
+    assert project(embeddings, mean, components).shape == (1, 2)